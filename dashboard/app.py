@@ -3,19 +3,8 @@ Streamlit Dashboard for Carbon-Aware Execution Intelligence
 """
 
 import streamlit as st
-import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-from datetime import datetime
-import sys
-import os
 
-# Add src to path
-sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
-
-from src.agent.carbon_agent import CarbonAwareAgent
-from src.context.execution_context import WorkloadContext, CriticalityLevel, UrgencyLevel
-from src.observability.metrics import MetricsCollector
+from carbon_intelligence.examples.workloads import get_example_workloads
 
 
 # Page configuration
@@ -26,75 +15,201 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+
+@st.cache_resource
+def get_agent():
+    """Agent shared by every session in this process"""
+    # Deferred: the agent stack pulls in CodeCarbon, which is slow to import
+    from carbon_intelligence.agent.carbon_agent import CarbonAwareAgent
+    return CarbonAwareAgent()
+
+
 # Initialize session state
-if 'agent' not in st.session_state:
-    st.session_state.agent = CarbonAwareAgent()
-    # Load example workloads if not already loaded
-    if 'workloads_loaded' not in st.session_state:
-        st.session_state.workloads_loaded = False
+# Loading examples is a per-user action, even though the agent is shared
+if 'workloads_loaded' not in st.session_state:
+    st.session_state.workloads_loaded = False
 
 
 def load_example_workloads():
     """Load example workloads"""
-    agent = st.session_state.agent
-    
-    # Fraud Detection Model (from proposal example)
-    fraud_detection = WorkloadContext(
-        workload_id="fraud_detection_v2",
-        model_name="fraud_detection_v2",
-        description="Detects fraudulent transactions in real-time",
-        criticality=CriticalityLevel.HIGH,
-        urgency=UrgencyLevel.URGENT,
-        sla_window_hours=2.0,
-        required_frequency_hours=2.0,
-        current_frequency_hours=1.0,  # Over-serving
-        current_schedule="every_1_hour",
-        estimated_duration_seconds=45.0,
-        cpu_cores=4,
-        gpu_required=False,
-        memory_gb=8.0
-    )
-    agent.register_workload(fraud_detection)
-    
-    # Sales Report (deferrable)
-    sales_report = WorkloadContext(
-        workload_id="batch_sales_report",
-        model_name="batch_sales_report",
-        description="Weekly sales analytics and reporting",
-        criticality=CriticalityLevel.LOW,
-        urgency=UrgencyLevel.BATCH,
-        sla_window_hours=24.0,
-        required_frequency_hours=24.0,
-        current_frequency_hours=24.0,
-        current_schedule="daily_at_2pm",
-        estimated_duration_seconds=120.0,
-        cpu_cores=2,
-        gpu_required=False,
-        memory_gb=4.0
-    )
-    agent.register_workload(sales_report)
-    
-    # Customer Recommendations (high value)
-    recommendations = WorkloadContext(
-        workload_id="customer_recommendations",
-        model_name="customer_recommendations",
-        description="Personalized product recommendations",
-        criticality=CriticalityLevel.HIGH,
-        urgency=UrgencyLevel.NORMAL,
-        sla_window_hours=1.0,
-        required_frequency_hours=1.0,
-        current_frequency_hours=1.0,
-        current_schedule="every_1_hour",
-        estimated_duration_seconds=30.0,
-        cpu_cores=2,
-        gpu_required=True,
-        memory_gb=16.0
-    )
-    agent.register_workload(recommendations)
-    
+    get_agent().register_workloads(get_example_workloads())
     st.session_state.workloads_loaded = True
 
 
+# Per-analysis summary columns reduced on the Dashboard page
+_SUMMARY_DTYPE = [
+    ("recommendations", "i4"),
+    ("high_impact", "i4"),
+    ("reduction_kg", "f8")
+]
+
+
+def _registry_fingerprint(agent) -> tuple:
+    """
+    Cheap, hashable summary of the workload registry used as a cache key
+    
+    Covers every WorkloadContext field (via its repr), because the analysis
+    caches are persisted to disk and must not outlive a changed definition.
+    """
+    return tuple(sorted(
+        (wid, repr(ctx))
+        for wid, ctx in agent.execution_context.workloads.items()
+    ))
+
+
+# Analyses are deterministic in the workload definitions, so the analysis
+# caches below are persisted to disk and survive app restarts. Persisted
+# caches do not support a TTL; a changed fingerprint is what invalidates them.
+@st.cache_data(persist="disk", show_spinner=False)
+def _cached_all_analyses(fingerprint: tuple) -> list:
+    """Analyses for all workloads, memoized on the registry fingerprint"""
+    return get_agent().get_all_workloads_analysis()
+
+
+@st.cache_data(persist="disk", show_spinner=False)
+def _cached_opportunities(fingerprint: tuple) -> list:
+    """Optimization opportunities, memoized on the registry fingerprint"""
+    return get_agent().get_optimization_opportunities()
+
+
+@st.cache_data(ttl=300)
+def _cached_workload_ids(fingerprint: tuple) -> list:
+    """Registered workload IDs, memoized on the registry fingerprint"""
+    return get_agent().execution_context.list_workloads()
+
+
+@st.cache_data(persist="disk", show_spinner=False)
+def _cached_analysis(workload_id: str, fingerprint: tuple) -> dict:
+    """Analysis of a single workload, memoized per workload and fingerprint"""
+    return get_agent().analyze_workload(workload_id)
+
+
+@st.cache_data(ttl=300)
+def _cached_overview_tables(fingerprint: tuple) -> tuple:
+    """
+    Arrow tables for the Dashboard page, memoized on the registry fingerprint
+    
+    Handing Streamlit Arrow tables directly skips the pandas-to-Arrow
+    conversion it would otherwise do on every rerun.
+    
+    Returns:
+        Tuple of (workload overview table, top opportunities table)
+    """
+    import pyarrow as pa
+    
+    analyses = [a for a in _cached_all_analyses(fingerprint) if "error" not in a]
+    top = _cached_opportunities(fingerprint)[:5]  # Top 5
+    
+    workload_table = pa.table({
+        "Workload": [a["workload_name"] for a in analyses],
+        "ID": [a["workload_id"] for a in analyses],
+        "CES Score": pa.array(
+            [a["carbon_efficiency_score"]["ces_score"] for a in analyses], type=pa.float64()
+        ),
+        "Recommendations": pa.array(
+            [a["summary"]["total_recommendations"] for a in analyses], type=pa.int32()
+        ),
+        "Potential Reduction (kg/day)": pa.array(
+            [a["summary"]["estimated_total_reduction_kg"] for a in analyses], type=pa.float64()
+        ),
+        "Criticality": [a["workload_context"]["criticality"] for a in analyses],
+        "Urgency": [a["workload_context"]["urgency"] for a in analyses]
+    })
+    
+    opportunity_table = pa.table({
+        "Workload": [opp["workload_name"] for opp in top],
+        "Recommendation": [opp["recommendation"]["title"] for opp in top],
+        "Impact": [opp["recommendation"]["impact_level"] for opp in top],
+        "Reduction (kg/day)": pa.array(
+            [opp["recommendation"]["estimated_emission_reduction_kg"] for opp in top],
+            type=pa.float64()
+        ),
+        "Risk": [opp["recommendation"]["business_risk"] for opp in top],
+        "Confidence": [opp["recommendation"]["confidence"] for opp in top]
+    })
+    
+    return workload_table, opportunity_table
+
+
+# Recommendations page options and layout
+_IMPACT_OPTIONS = ("significant", "moderate", "minor")
+_RISK_OPTIONS = ("low", "medium", "high")
+_RISK_BADGES = {
+    "low": "🟢",
+    "medium": "🟡",
+    "high": "🔴"
+}
+_CARD_COLUMN_WIDTHS = (2, 1, 1)
+
+
+@st.fragment
+def _render_recommendations(opportunities: list) -> None:
+    """
+    Render the filter widgets and the filtered recommendation cards
+    
+    Runs as a fragment, so changing a filter only reruns this section
+    instead of the whole script.
+    
+    Args:
+        opportunities: Optimization opportunities to filter and display
+    """
+    # Filter options
+    col1, col2 = st.columns(2)
+    with col1:
+        impact_filter = st.multiselect(
+            "Filter by Impact",
+            _IMPACT_OPTIONS,
+            default=["significant", "moderate"]
+        )
+    with col2:
+        risk_filter = st.multiselect(
+            "Filter by Risk",
+            _RISK_OPTIONS,
+            default=["low", "medium"]
+        )
+    
+    # Filter opportunities
+    impact_set = frozenset(impact_filter)
+    risk_set = frozenset(risk_filter)
+    filtered = [
+        opp for opp in opportunities
+        for rec in (opp["recommendation"],)
+        if rec["impact_level"] in impact_set and rec["business_risk"] in risk_set
+    ]
+    
+    st.metric("Filtered Opportunities", len(filtered))
+    
+    # Display recommendations
+    for i, opp in enumerate(filtered, 1):
+        rec = opp["recommendation"]
+        
+        with st.container():
+            st.markdown(f"### {i}. {rec['title']}")
+            
+            col1, col2, col3 = st.columns(_CARD_COLUMN_WIDTHS)
+            with col1:
+                st.markdown(f"**Workload:** {opp['workload_name']}")
+                st.markdown(f"**Description:** {rec['description']}")
+            with col2:
+                st.metric(
+                    "Reduction",
+                    f"{rec['estimated_emission_reduction_kg']:.4f} kg/day"
+                )
+            with col3:
+                badge_color = _RISK_BADGES.get(rec['business_risk'], "⚪")
+                st.markdown(f"**Risk:** {badge_color} {rec['business_risk'].title()}")
+            
+            with st.expander("View Details"):
+                st.markdown("**Rationale:**")
+                st.markdown(rec['rationale'])
+                st.markdown("**Current State:**")
+                st.json(rec['current_state'])
+                st.markdown("**Recommended Action:**")
+                st.json(rec['recommended_action'])
+            
+            st.divider()
+
+
 # Sidebar
 with st.sidebar:
     st.title("🌱 Carbon-Aware AI")
@@ -124,19 +239,34 @@ if page == "Dashboard":
     if not st.session_state.workloads_loaded:
         st.info("👆 Click 'Load Example Workloads' in the sidebar to get started")
     else:
-        agent = st.session_state.agent
+        import numpy as np
+        
+        agent = get_agent()
+        fingerprint = _registry_fingerprint(agent)
         
         # Get all analyses
-        analyses = agent.get_all_workloads_analysis()
-        opportunities = agent.get_optimization_opportunities()
+        analyses = _cached_all_analyses(fingerprint)
+        opportunities = _cached_opportunities(fingerprint)
+        workload_table, opportunity_table = _cached_overview_tables(fingerprint)
         
         # Summary metrics
         col1, col2, col3, col4 = st.columns(4)
         
+        # One pass over the analyses, then vectorized column sums
+        summaries = np.fromiter(
+            (
+                (a["summary"]["total_recommendations"],
+                 a["summary"]["high_impact_count"],
+                 a["summary"]["estimated_total_reduction_kg"])
+                for a in analyses if "error" not in a
+            ),
+            dtype=_SUMMARY_DTYPE
+        )
+        
         total_workloads = len(analyses)
-        total_recommendations = sum(a.get("summary", {}).get("total_recommendations", 0) for a in analyses)
-        high_impact = sum(a.get("summary", {}).get("high_impact_count", 0) for a in analyses)
-        total_potential_reduction = sum(a.get("summary", {}).get("estimated_total_reduction_kg", 0) for a in analyses)
+        total_recommendations = int(summaries["recommendations"].sum())
+        high_impact = int(summaries["high_impact"].sum())
+        total_potential_reduction = float(summaries["reduction_kg"].sum())
         
         with col1:
             st.metric("Total Workloads", total_workloads)
@@ -152,43 +282,14 @@ if page == "Dashboard":
         # Workloads overview table
         st.subheader("Workload Overview")
         
-        workload_data = []
-        for analysis in analyses:
-            if "error" in analysis:
-                continue
-            workload_data.append({
-                "Workload": analysis["workload_name"],
-                "ID": analysis["workload_id"],
-                "CES Score": analysis["carbon_efficiency_score"]["ces_score"],
-                "Recommendations": analysis["summary"]["total_recommendations"],
-                "Potential Reduction (kg/day)": analysis["summary"]["estimated_total_reduction_kg"],
-                "Criticality": analysis["workload_context"]["criticality"],
-                "Urgency": analysis["workload_context"]["urgency"]
-            })
-        
-        if workload_data:
-            df = pd.DataFrame(workload_data)
-            st.dataframe(df, use_container_width=True, hide_index=True)
+        if workload_table.num_rows:
+            st.dataframe(workload_table, use_container_width=True, hide_index=True)
         
         # Optimization opportunities
         if opportunities:
             st.divider()
             st.subheader("Top Optimization Opportunities")
-            
-            opp_data = []
-            for opp in opportunities[:5]:  # Top 5
-                rec = opp["recommendation"]
-                opp_data.append({
-                    "Workload": opp["workload_name"],
-                    "Recommendation": rec["title"],
-                    "Impact": rec["impact_level"],
-                    "Reduction (kg/day)": rec["estimated_emission_reduction_kg"],
-                    "Risk": rec["business_risk"],
-                    "Confidence": rec["confidence"]
-                })
-            
-            df_opp = pd.DataFrame(opp_data)
-            st.dataframe(df_opp, use_container_width=True, hide_index=True)
+            st.dataframe(opportunity_table, use_container_width=True, hide_index=True)
 
 
 elif page == "Workload Analysis":
@@ -198,8 +299,8 @@ elif page == "Workload Analysis":
     if not st.session_state.workloads_loaded:
         st.info("👆 Click 'Load Example Workloads' in the sidebar to get started")
     else:
-        agent = st.session_state.agent
-        workload_ids = agent.execution_context.list_workloads()
+        fingerprint = _registry_fingerprint(get_agent())
+        workload_ids = _cached_workload_ids(fingerprint)
         
         if not workload_ids:
             st.warning("No workloads registered")
@@ -207,24 +308,29 @@ elif page == "Workload Analysis":
             selected_workload = st.selectbox("Select Workload", workload_ids)
             
             if selected_workload:
-                analysis = agent.analyze_workload(selected_workload)
+                analysis = _cached_analysis(selected_workload, fingerprint)
                 
                 # Workload context
                 st.subheader("Workload Context")
                 context = analysis["workload_context"]
                 
                 col1, col2 = st.columns(2)
+                # One markdown element per column; "  \n" is a markdown line break
                 with col1:
-                    st.markdown(f"**Model:** {context['model_name']}")
-                    st.markdown(f"**Description:** {context['description']}")
-                    st.markdown(f"**Criticality:** {context['criticality']}")
-                    st.markdown(f"**Urgency:** {context['urgency']}")
+                    st.markdown(
+                        f"**Model:** {context['model_name']}  \n"
+                        f"**Description:** {context['description']}  \n"
+                        f"**Criticality:** {context['criticality']}  \n"
+                        f"**Urgency:** {context['urgency']}"
+                    )
                 
                 with col2:
-                    st.markdown(f"**SLA Window:** {context['sla_window_hours']} hours")
-                    st.markdown(f"**Required Frequency:** {context['required_frequency_hours']} hours")
-                    st.markdown(f"**Current Frequency:** {context['current_frequency_hours']} hours")
-                    st.markdown(f"**Current Schedule:** {context['current_schedule']}")
+                    st.markdown(
+                        f"**SLA Window:** {context['sla_window_hours']} hours  \n"
+                        f"**Required Frequency:** {context['required_frequency_hours']} hours  \n"
+                        f"**Current Frequency:** {context['current_frequency_hours']} hours  \n"
+                        f"**Current Schedule:** {context['current_schedule']}"
+                    )
                 
                 # Carbon Efficiency Score
                 st.divider()
@@ -287,9 +393,10 @@ elif page == "Workload Analysis":
                             st.json(rec['recommended_action'])
                             
                             if rec['implementation_steps']:
-                                st.markdown("**Implementation Steps:**")
-                                for step in rec['implementation_steps']:
-                                    st.markdown(f"- {step}")
+                                st.markdown(
+                                    "**Implementation Steps:**\n\n"
+                                    + "\n".join(f"- {step}" for step in rec['implementation_steps'])
+                                )
                 else:
                     st.info("No recommendations available")
 
@@ -301,69 +408,13 @@ elif page == "Recommendations":
     if not st.session_state.workloads_loaded:
         st.info("👆 Click 'Load Example Workloads' in the sidebar to get started")
     else:
-        agent = st.session_state.agent
-        opportunities = agent.get_optimization_opportunities()
+        agent = get_agent()
+        opportunities = _cached_opportunities(_registry_fingerprint(agent))
         
         if not opportunities:
             st.info("No optimization opportunities identified at this time")
         else:
-            # Filter options
-            col1, col2 = st.columns(2)
-            with col1:
-                impact_filter = st.multiselect(
-                    "Filter by Impact",
-                    ["significant", "moderate", "minor"],
-                    default=["significant", "moderate"]
-                )
-            with col2:
-                risk_filter = st.multiselect(
-                    "Filter by Risk",
-                    ["low", "medium", "high"],
-                    default=["low", "medium"]
-                )
-            
-            # Filter opportunities
-            filtered = [
-                opp for opp in opportunities
-                if opp["recommendation"]["impact_level"] in impact_filter
-                and opp["recommendation"]["business_risk"] in risk_filter
-            ]
-            
-            st.metric("Filtered Opportunities", len(filtered))
-            
-            # Display recommendations
-            for i, opp in enumerate(filtered, 1):
-                rec = opp["recommendation"]
-                
-                with st.container():
-                    st.markdown(f"### {i}. {rec['title']}")
-                    
-                    col1, col2, col3 = st.columns([2, 1, 1])
-                    with col1:
-                        st.markdown(f"**Workload:** {opp['workload_name']}")
-                        st.markdown(f"**Description:** {rec['description']}")
-                    with col2:
-                        st.metric(
-                            "Reduction",
-                            f"{rec['estimated_emission_reduction_kg']:.4f} kg/day"
-                        )
-                    with col3:
-                        badge_color = {
-                            "low": "🟢",
-                            "medium": "🟡",
-                            "high": "🔴"
-                        }.get(rec['business_risk'], "⚪")
-                        st.markdown(f"**Risk:** {badge_color} {rec['business_risk'].title()}")
-                    
-                    with st.expander("View Details"):
-                        st.markdown("**Rationale:**")
-                        st.markdown(rec['rationale'])
-                        st.markdown("**Current State:**")
-                        st.json(rec['current_state'])
-                        st.markdown("**Recommended Action:**")
-                        st.json(rec['recommended_action'])
-                    
-                    st.divider()
+            _render_recommendations(opportunities)
 
 
 elif page == "About":
@@ -400,7 +451,7 @@ elif page == "About":
     
     ### Technology Stack
     
-    - **Python 3.8+**: Core language
+    - **Python 3.10+**: Core language
     - **CodeCarbon**: Carbon emission tracking
     - **Streamlit**: Dashboard interface
     - **LangChain**: Agentic reasoning (future enhancement)
@@ -0,0 +1,54 @@
+"""
+Numeric kernels for batch reasoning over many workloads
+"""
+
+import numpy as np
+
+from carbon_intelligence.utils.jit import njit
+
+
+# Business risk codes returned by score_frequency
+RISK_LOW = 0
+RISK_MEDIUM = 1
+RISK_HIGH = 2
+
+# Impact level codes returned by score_frequency
+IMPACT_SIGNIFICANT = 0
+IMPACT_MODERATE = 1
+IMPACT_MINOR = 2
+
+
+@njit(parallel=True, cache=True)
+def score_frequency(cur_freq, req_freq, sla_window, emissions):
+    """
+    Score frequency-reduction opportunities for a batch of workloads
+    
+    Mirrors ReasoningEngine._analyze_frequency_optimization, one array
+    element per workload. Callers decide which workloads qualify.
+    
+    Args:
+        cur_freq: Current execution interval in hours
+        req_freq: Required execution interval in hours
+        sla_window: SLA window in hours
+        emissions: Emissions per run in kg CO₂
+        
+    Returns:
+        Tuple of (reduction_kg_per_day, reduction_percent, risk_code, impact_code)
+    """
+    runs_current = 24.0 / cur_freq
+    runs_saved = runs_current - 24.0 / req_freq
+    
+    reduction_kg = runs_saved * emissions
+    reduction_percent = (runs_saved / runs_current) * 100.0
+    
+    sla_margin = (sla_window - req_freq) / sla_window
+    risk_code = np.where(
+        sla_margin > 0.3, RISK_LOW, np.where(sla_margin > 0.1, RISK_MEDIUM, RISK_HIGH)
+    )
+    impact_code = np.where(
+        reduction_percent > 30.0,
+        IMPACT_SIGNIFICANT,
+        np.where(reduction_percent > 15.0, IMPACT_MODERATE, IMPACT_MINOR)
+    )
+    
+    return reduction_kg, reduction_percent, risk_code, impact_code
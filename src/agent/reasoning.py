@@ -2,10 +2,14 @@
 Agentic reasoning logic for carbon-aware recommendations
 """
 
-from typing import Dict, List, Optional
-from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence
+from dataclasses import dataclass, field
 from enum import Enum
-from src.context.execution_context import WorkloadContext, CriticalityLevel, UrgencyLevel
+
+import numpy as np
+
+from carbon_intelligence.context.execution_context import WorkloadContext, CriticalityLevel, UrgencyLevel
+from carbon_intelligence.agent import _reasoning_kernels as kernels
 
 
 class RecommendationType(str, Enum):
@@ -31,7 +35,7 @@ class ImpactLevel(str, Enum):
     MINOR = "minor"
 
 
-@dataclass
+@dataclass(slots=True)
 class Recommendation:
     """A carbon-aware execution recommendation"""
     
@@ -47,7 +51,7 @@ class Recommendation:
     # Recommended action
     recommended_action: Dict
     
-    # Impact prediction
+    # Impact prediction (full precision; to_dict rounds for output)
     estimated_emission_reduction_kg: float
     estimated_emission_reduction_percent: float
     business_risk: str  # "low", "medium", "high"
@@ -55,11 +59,27 @@ class Recommendation:
     impact_level: ImpactLevel
     
     # Additional context
-    prerequisites: List[str]
-    implementation_steps: List[str]
+    prerequisites: Sequence[str]
+    implementation_steps: Sequence[str]
+    
+    # impact_level.value, resolved once for the summary/filter hot paths
+    impact_value: str = field(init=False, repr=False)
+    
+    # Serialized form, built on the first to_dict() call
+    _dict_cache: Optional[Dict] = field(default=None, init=False, compare=False, repr=False)
+    
+    def __post_init__(self):
+        """Resolve derived fields"""
+        self.impact_value = self.impact_level.value
     
     def to_dict(self) -> Dict:
-        """Convert to dictionary"""
+        """Convert to dictionary (built once, then shared)"""
+        if self._dict_cache is None:
+            self._dict_cache = self._build_dict()
+        return self._dict_cache
+    
+    def _build_dict(self) -> Dict:
+        """Build the dictionary returned by to_dict"""
         return {
             "workload_id": self.workload_id,
             "recommendation_type": self.recommendation_type.value,
@@ -68,16 +88,54 @@ class Recommendation:
             "rationale": self.rationale,
             "current_state": self.current_state,
             "recommended_action": self.recommended_action,
-            "estimated_emission_reduction_kg": self.estimated_emission_reduction_kg,
-            "estimated_emission_reduction_percent": self.estimated_emission_reduction_percent,
+            "estimated_emission_reduction_kg": round(self.estimated_emission_reduction_kg, 4),
+            "estimated_emission_reduction_percent": round(self.estimated_emission_reduction_percent, 1),
             "business_risk": self.business_risk,
             "confidence": self.confidence.value,
-            "impact_level": self.impact_level.value,
-            "prerequisites": self.prerequisites,
-            "implementation_steps": self.implementation_steps
+            "impact_level": self.impact_value,
+            "prerequisites": list(self.prerequisites),
+            "implementation_steps": list(self.implementation_steps)
         }
 
 
+# Lookups from _reasoning_kernels codes to recommendation fields
+_RISK_LABELS = ("low", "medium", "high")
+_IMPACT_LEVELS = (ImpactLevel.SIGNIFICANT, ImpactLevel.MODERATE, ImpactLevel.MINOR)
+
+# Fixed prerequisites and implementation steps, shared by every recommendation
+_FREQUENCY_PREREQS = (
+    "Validate SLA requirements are accurate",
+    "Confirm business stakeholders approve frequency change"
+)
+_FREQUENCY_STEPS_AFTER_UPDATE = (
+    "Monitor execution for 1 week in test environment",
+    "Validate SLA compliance metrics",
+    "Deploy to production after validation"
+)
+_TIME_SHIFT_PREREQS = (
+    "Verify workload can be deferred without business impact",
+    "Check regional grid carbon intensity patterns"
+)
+_TIME_SHIFT_STEPS = (
+    "Identify optimal time window based on grid data",
+    "Update scheduler to preferred time slot",
+    "Monitor for any business impact"
+)
+_RESOURCE_PREREQS = (
+    "Collect detailed resource utilization metrics",
+    "Profile workload performance characteristics"
+)
+_RESOURCE_STEPS = (
+    "Run resource profiling analysis",
+    "Identify optimization opportunities",
+    "Test optimized configuration",
+    "Deploy if validated"
+)
+_NO_ACTION_STEPS = (
+    "Continue monitoring for future optimization opportunities",
+)
+
+
 class ReasoningEngine:
     """Engine for reasoning about carbon-aware optimizations"""
     
@@ -88,7 +146,8 @@ class ReasoningEngine:
     def analyze_workload(self,
                         workload: WorkloadContext,
                         emissions_per_run_kg: float,
-                        execution_history: Optional[List[Dict]] = None) -> List[Recommendation]:
+                        execution_history: Optional[List[Dict]] = None,
+                        is_over_serving: Optional[bool] = None) -> List[Recommendation]:
         """
         Analyze a workload and generate recommendations
         
@@ -96,50 +155,126 @@ class ReasoningEngine:
             workload: Workload context
             emissions_per_run_kg: Average emissions per execution
             execution_history: Optional execution history
+            is_over_serving: workload.is_over_serving(), if the caller
+                already computed it
             
         Returns:
             List of recommendations sorted by impact
         """
         recommendations = []
         
+        if is_over_serving is None:
+            is_over_serving = workload.is_over_serving()
+        
         # Check for frequency optimization
-        if workload.is_over_serving():
+        if is_over_serving:
             freq_rec = self._analyze_frequency_optimization(workload, emissions_per_run_kg)
             if freq_rec:
                 recommendations.append(freq_rec)
         
+        return self._complete_recommendations(workload, emissions_per_run_kg, recommendations)
+    
+    def analyze_workload_batch(self,
+                               workloads: Sequence[WorkloadContext],
+                               emissions_per_run_kg: Sequence[float]) -> List[List[Recommendation]]:
+        """
+        Analyze many workloads at once
+        
+        The frequency arithmetic runs as one vectorized kernel over all
+        workloads; Recommendation objects are only built for workloads that
+        pass the gates. Results match calling analyze_workload per workload.
+        
+        Args:
+            workloads: Workload contexts
+            emissions_per_run_kg: Average emissions per execution, per workload
+            
+        Returns:
+            One list of recommendations (sorted by impact) per workload
+        """
+        n = len(workloads)
+        cur_freq = np.fromiter((w.current_frequency_hours for w in workloads), np.float64, n)
+        req_freq = np.fromiter((w.required_frequency_hours for w in workloads), np.float64, n)
+        sla_window = np.fromiter((w.sla_window_hours for w in workloads), np.float64, n)
+        emissions = np.asarray(emissions_per_run_kg, dtype=np.float64)
+        
+        # Zero intervals yield inf/nan here, which simply fail the gates below
+        with np.errstate(divide="ignore", invalid="ignore"):
+            reduction_kg, reduction_percent, risk_code, impact_code = kernels.score_frequency(
+                cur_freq, req_freq, sla_window, emissions
+            )
+            qualifies = (
+                (cur_freq < req_freq) &
+                (reduction_percent >= 10) &
+                (risk_code != kernels.RISK_HIGH)
+            )
+        
+            runs_current = 24.0 / cur_freq
+            runs_optimal = 24.0 / req_freq
+        
+        results = []
+        for i, workload in enumerate(workloads):
+            recommendations = []
+            if qualifies[i]:
+                recommendations.append(self._build_frequency_recommendation(
+                    workload,
+                    float(emissions[i]),
+                    executions_per_day_current=float(runs_current[i]),
+                    executions_per_day_optimal=float(runs_optimal[i]),
+                    emission_reduction_per_day=float(reduction_kg[i]),
+                    emission_reduction_percent=float(reduction_percent[i]),
+                    business_risk=_RISK_LABELS[risk_code[i]],
+                    impact_level=_IMPACT_LEVELS[impact_code[i]]
+                ))
+            results.append(
+                self._complete_recommendations(workload, float(emissions[i]), recommendations)
+            )
+        return results
+    
+    def _complete_recommendations(self,
+                                  workload: WorkloadContext,
+                                  emissions_per_run_kg: float,
+                                  recommendations: List[Recommendation]) -> List[Recommendation]:
+        """
+        Add the non-frequency recommendations and sort by impact
+        
+        All gating happens here, cheapest checks first, so a Recommendation
+        is only built once it is known to be returned. Time-shift and
+        resource savings are a share of per-run emissions, so they are
+        skipped for workloads with no measured emissions.
+        """
+        has_emissions = emissions_per_run_kg > 0
+        
         # Check for time-shifting opportunities (if deferrable)
-        if (workload.urgency in [UrgencyLevel.BATCH, UrgencyLevel.DEFERRABLE] and
-            workload.criticality != CriticalityLevel.CRITICAL):
-            time_rec = self._analyze_time_shift(workload, emissions_per_run_kg)
-            if time_rec:
-                recommendations.append(time_rec)
+        if (has_emissions and
+            workload.criticality != CriticalityLevel.CRITICAL and
+            workload.urgency in (UrgencyLevel.BATCH, UrgencyLevel.DEFERRABLE)):
+            recommendations.append(self._analyze_time_shift(workload, emissions_per_run_kg))
         
         # Check for resource optimization
-        if workload.gpu_required and workload.estimated_duration_seconds > 300:
-            resource_rec = self._analyze_resource_optimization(workload, emissions_per_run_kg)
-            if resource_rec:
-                recommendations.append(resource_rec)
+        if (has_emissions and
+            workload.gpu_required and
+            workload.estimated_duration_seconds > 300):
+            recommendations.append(
+                self._analyze_resource_optimization(workload, emissions_per_run_kg)
+            )
         
         # If no optimizations found, provide no-action recommendation
         if not recommendations:
-            recommendations.append(self._generate_no_action_recommendation(workload))
+            return [self._generate_no_action_recommendation(workload)]
         
         # Sort by impact (highest first)
-        recommendations.sort(
-            key=lambda r: r.estimated_emission_reduction_kg,
-            reverse=True
-        )
+        if len(recommendations) > 1:
+            recommendations.sort(
+                key=lambda r: r.estimated_emission_reduction_kg,
+                reverse=True
+            )
         
         return recommendations
     
     def _analyze_frequency_optimization(self,
                                        workload: WorkloadContext,
                                        emissions_per_run_kg: float) -> Optional[Recommendation]:
-        """Analyze frequency optimization opportunity"""
-        
-        if not workload.is_over_serving():
-            return None
+        """Analyze frequency optimization opportunity (workload must be over-serving)"""
         
         # Calculate optimal frequency (align with SLA)
         optimal_frequency = workload.required_frequency_hours
@@ -153,8 +288,9 @@ class ReasoningEngine:
         emission_reduction_per_day = reduction_per_day * emissions_per_run_kg
         emission_reduction_percent = (reduction_per_day / executions_per_day_current) * 100
         
-        # Determine business risk
-        sla_margin = (workload.sla_window_hours - optimal_frequency) / workload.sla_window_hours
+        # Determine business risk (a zero SLA window leaves no margin at all)
+        sla_window = workload.sla_window_hours
+        sla_margin = (sla_window - optimal_frequency) / sla_window if sla_window else float("-inf")
         if sla_margin > 0.3:
             business_risk = "low"
         elif sla_margin > 0.1:
@@ -174,6 +310,31 @@ class ReasoningEngine:
         else:
             impact_level = ImpactLevel.MINOR
         
+        return self._build_frequency_recommendation(
+            workload,
+            emissions_per_run_kg,
+            executions_per_day_current=executions_per_day_current,
+            executions_per_day_optimal=executions_per_day_optimal,
+            emission_reduction_per_day=emission_reduction_per_day,
+            emission_reduction_percent=emission_reduction_percent,
+            business_risk=business_risk,
+            impact_level=impact_level
+        )
+    
+    def _build_frequency_recommendation(self,
+                                        workload: WorkloadContext,
+                                        emissions_per_run_kg: float,
+                                        executions_per_day_current: float,
+                                        executions_per_day_optimal: float,
+                                        emission_reduction_per_day: float,
+                                        emission_reduction_percent: float,
+                                        business_risk: str,
+                                        impact_level: ImpactLevel) -> Recommendation:
+        """Build a frequency recommendation from already-scored values"""
+        
+        optimal_frequency = workload.required_frequency_hours
+        current_frequency = workload.current_frequency_hours
+        
         return Recommendation(
             workload_id=workload.workload_id,
             recommendation_type=RecommendationType.REDUCE_FREQUENCY,
@@ -195,27 +356,22 @@ class ReasoningEngine:
                 "executions_per_day": round(executions_per_day_optimal, 1),
                 "new_schedule": f"every_{optimal_frequency}_hours"
             },
-            estimated_emission_reduction_kg=round(emission_reduction_per_day, 4),
-            estimated_emission_reduction_percent=round(emission_reduction_percent, 1),
+            estimated_emission_reduction_kg=emission_reduction_per_day,
+            estimated_emission_reduction_percent=emission_reduction_percent,
             business_risk=business_risk,
             confidence=ConfidenceLevel.HIGH if business_risk == "low" else ConfidenceLevel.MEDIUM,
             impact_level=impact_level,
-            prerequisites=[
-                "Validate SLA requirements are accurate",
-                "Confirm business stakeholders approve frequency change"
-            ],
-            implementation_steps=[
+            prerequisites=_FREQUENCY_PREREQS,
+            implementation_steps=(
                 f"Update scheduler configuration to {optimal_frequency}h interval",
-                "Monitor execution for 1 week in test environment",
-                "Validate SLA compliance metrics",
-                "Deploy to production after validation"
-            ]
+                *_FREQUENCY_STEPS_AFTER_UPDATE
+            )
         )
     
     def _analyze_time_shift(self,
                            workload: WorkloadContext,
-                           emissions_per_run_kg: float) -> Optional[Recommendation]:
-        """Analyze time-shifting opportunity"""
+                           emissions_per_run_kg: float) -> Recommendation:
+        """Build a time-shifting recommendation (gated by the caller)"""
         
         # Simplified: recommend shifting to off-peak hours
         # In production, this would use actual grid carbon intensity data
@@ -237,26 +393,19 @@ class ReasoningEngine:
                 "suggested_time": "off_peak_hours",
                 "estimated_carbon_intensity_reduction": "10-20%"
             },
-            estimated_emission_reduction_kg=round(emissions_per_run_kg * 0.15, 4),  # ~15% reduction
+            estimated_emission_reduction_kg=emissions_per_run_kg * 0.15,  # ~15% reduction
             estimated_emission_reduction_percent=15.0,
             business_risk="low",
             confidence=ConfidenceLevel.MEDIUM,
             impact_level=ImpactLevel.MODERATE,
-            prerequisites=[
-                "Verify workload can be deferred without business impact",
-                "Check regional grid carbon intensity patterns"
-            ],
-            implementation_steps=[
-                "Identify optimal time window based on grid data",
-                "Update scheduler to preferred time slot",
-                "Monitor for any business impact"
-            ]
+            prerequisites=_TIME_SHIFT_PREREQS,
+            implementation_steps=_TIME_SHIFT_STEPS
         )
     
     def _analyze_resource_optimization(self,
                                      workload: WorkloadContext,
-                                     emissions_per_run_kg: float) -> Optional[Recommendation]:
-        """Analyze resource optimization opportunity"""
+                                     emissions_per_run_kg: float) -> Recommendation:
+        """Build a resource optimization recommendation (gated by the caller)"""
         
         # Simplified recommendation
         return Recommendation(
@@ -276,21 +425,13 @@ class ReasoningEngine:
                 "action": "review_resource_allocation",
                 "suggested_review_areas": ["GPU utilization", "Memory allocation", "Batch sizing"]
             },
-            estimated_emission_reduction_kg=round(emissions_per_run_kg * 0.1, 4),  # ~10% potential
+            estimated_emission_reduction_kg=emissions_per_run_kg * 0.1,  # ~10% potential
             estimated_emission_reduction_percent=10.0,
             business_risk="low",
             confidence=ConfidenceLevel.LOW,
             impact_level=ImpactLevel.MINOR,
-            prerequisites=[
-                "Collect detailed resource utilization metrics",
-                "Profile workload performance characteristics"
-            ],
-            implementation_steps=[
-                "Run resource profiling analysis",
-                "Identify optimization opportunities",
-                "Test optimized configuration",
-                "Deploy if validated"
-            ]
+            prerequisites=_RESOURCE_PREREQS,
+            implementation_steps=_RESOURCE_STEPS
         )
     
     def _generate_no_action_recommendation(self, workload: WorkloadContext) -> Recommendation:
@@ -306,8 +447,8 @@ class ReasoningEngine:
                      f"optimization opportunities identified.",
             current_state={
                 "frequency_alignment": "good",
-                "criticality": workload.criticality.value,
-                "urgency": workload.urgency.value
+                "criticality": workload.criticality.label,
+                "urgency": workload.urgency.label
             },
             recommended_action={
                 "action": "maintain_current_configuration"
@@ -317,9 +458,7 @@ class ReasoningEngine:
             business_risk="none",
             confidence=ConfidenceLevel.HIGH,
             impact_level=ImpactLevel.MINOR,
-            prerequisites=[],
-            implementation_steps=[
-                "Continue monitoring for future optimization opportunities"
-            ]
+            prerequisites=(),
+            implementation_steps=_NO_ACTION_STEPS
         )
 
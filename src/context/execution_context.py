@@ -2,32 +2,64 @@
 Execution context management for AI workloads
 """
 
-from typing import Dict, Optional, Literal
-from dataclasses import dataclass, asdict
-from enum import Enum
+from typing import Dict, Iterable, List, Optional, Literal
+from dataclasses import dataclass
+from enum import IntEnum
 
+import numpy as np
 
-class CriticalityLevel(str, Enum):
+
+class _Level(IntEnum):
+    """Integer-coded level serialized as its lowercase name"""
+    
+    @property
+    def label(self) -> str:
+        """Serialized label, e.g. "real_time" for REAL_TIME"""
+        return self.name.lower()
+    
+    @classmethod
+    def from_label(cls, label: str) -> '_Level':
+        """
+        Look up a level by its serialized label
+        
+        Args:
+            label: Lowercase level name
+            
+        Returns:
+            Matching level
+        """
+        try:
+            return cls[label.upper()]
+        except KeyError:
+            raise ValueError(f"{label!r} is not a valid {cls.__name__}") from None
+
+
+class CriticalityLevel(_Level):
     """Business criticality levels"""
-    CRITICAL = "critical"
-    HIGH = "high"
-    MEDIUM = "medium"
-    LOW = "low"
-    DEFERRABLE = "deferrable"
+    CRITICAL = 0
+    HIGH = 1
+    MEDIUM = 2
+    LOW = 3
+    DEFERRABLE = 4
 
 
-class UrgencyLevel(str, Enum):
+class UrgencyLevel(_Level):
     """Execution urgency levels"""
-    REAL_TIME = "real_time"
-    URGENT = "urgent"
-    NORMAL = "normal"
-    BATCH = "batch"
-    DEFERRABLE = "deferrable"
+    REAL_TIME = 0
+    URGENT = 1
+    NORMAL = 2
+    BATCH = 3
+    DEFERRABLE = 4
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class WorkloadContext:
-    """Context information for an AI workload"""
+    """
+    Context information for an AI workload
+    
+    Instances are immutable; use dataclasses.replace() to derive a changed
+    context and register that instead.
+    """
     
     workload_id: str
     model_name: str
@@ -56,17 +88,30 @@ class WorkloadContext:
     
     def to_dict(self) -> Dict:
         """Convert to dictionary"""
-        result = asdict(self)
-        result['criticality'] = self.criticality.value
-        result['urgency'] = self.urgency.value
-        return result
+        # Built by hand: asdict() deep-copies every field, metadata included
+        return {
+            "workload_id": self.workload_id,
+            "model_name": self.model_name,
+            "description": self.description,
+            "criticality": self.criticality.label,
+            "urgency": self.urgency.label,
+            "sla_window_hours": self.sla_window_hours,
+            "required_frequency_hours": self.required_frequency_hours,
+            "current_frequency_hours": self.current_frequency_hours,
+            "current_schedule": self.current_schedule,
+            "estimated_duration_seconds": self.estimated_duration_seconds,
+            "cpu_cores": self.cpu_cores,
+            "gpu_required": self.gpu_required,
+            "memory_gb": self.memory_gb,
+            "metadata": dict(self.metadata) if self.metadata is not None else None
+        }
     
     @classmethod
     def from_dict(cls, data: Dict) -> 'WorkloadContext':
         """Create from dictionary"""
         data = data.copy()
-        data['criticality'] = CriticalityLevel(data['criticality'])
-        data['urgency'] = UrgencyLevel(data['urgency'])
+        data['criticality'] = CriticalityLevel.from_label(data['criticality'])
+        data['urgency'] = UrgencyLevel.from_label(data['urgency'])
         return cls(**data)
     
     def is_over_serving(self) -> bool:
@@ -90,12 +135,29 @@ class WorkloadContext:
         return self.required_frequency_hours / self.current_frequency_hours
 
 
+_INITIAL_CAPACITY = 16
+
+
 class ExecutionContext:
-    """Manages execution context for multiple workloads"""
+    """
+    Manages execution context for multiple workloads
+    
+    Besides the workloads dict, the fields used for candidate selection are
+    mirrored into parallel NumPy columns so filtering is one vectorized mask.
+    Changing a workload's context means registering a replacement context.
+    """
     
     def __init__(self):
         """Initialize context manager"""
         self.workloads: Dict[str, WorkloadContext] = {}
+        
+        # Column storage; row i describes self._rows[i]
+        self._rows: List[WorkloadContext] = []
+        self._row_index: Dict[str, int] = {}
+        self._current_freq = np.empty(_INITIAL_CAPACITY, dtype=np.float64)
+        self._required_freq = np.empty(_INITIAL_CAPACITY, dtype=np.float64)
+        self._criticality = np.empty(_INITIAL_CAPACITY, dtype=np.uint8)
+        self._urgency = np.empty(_INITIAL_CAPACITY, dtype=np.uint8)
     
     def register_workload(self, context: WorkloadContext) -> None:
         """
@@ -105,6 +167,18 @@ class ExecutionContext:
             context: Workload context to register
         """
         self.workloads[context.workload_id] = context
+        self._store_row(context)
+    
+    def register_workloads(self, contexts: Iterable[WorkloadContext]) -> None:
+        """
+        Register several workload contexts in one call
+        
+        Args:
+            contexts: Workload contexts to register
+        """
+        for context in contexts:
+            self.workloads[context.workload_id] = context
+            self._store_row(context)
     
     def get_workload(self, workload_id: str) -> Optional[WorkloadContext]:
         """
@@ -146,11 +220,37 @@ class ExecutionContext:
         Returns:
             List of workloads that are candidates for optimization
         """
-        candidates = []
-        for workload in self.workloads.values():
-            if (workload.is_over_serving() and 
-                workload.criticality != CriticalityLevel.CRITICAL and
-                workload.urgency != UrgencyLevel.REAL_TIME):
-                candidates.append(workload)
-        return candidates
+        n = len(self._rows)
+        mask = (
+            (self._current_freq[:n] < self._required_freq[:n]) &
+            (self._criticality[:n] != CriticalityLevel.CRITICAL) &
+            (self._urgency[:n] != UrgencyLevel.REAL_TIME)
+        )
+        return [self._rows[i] for i in np.flatnonzero(mask)]
+    
+    def _store_row(self, context: WorkloadContext) -> None:
+        """Write a context into the column arrays, growing them if needed"""
+        row = self._row_index.get(context.workload_id)
+        if row is None:
+            row = len(self._rows)
+            if row == len(self._current_freq):
+                self._grow()
+            self._row_index[context.workload_id] = row
+            self._rows.append(context)
+        else:
+            self._rows[row] = context
+        
+        self._current_freq[row] = context.current_frequency_hours
+        self._required_freq[row] = context.required_frequency_hours
+        self._criticality[row] = context.criticality
+        self._urgency[row] = context.urgency
+    
+    def _grow(self) -> None:
+        """Double the capacity of the column arrays"""
+        capacity = 2 * len(self._current_freq)
+        for name in ("_current_freq", "_required_freq", "_criticality", "_urgency"):
+            column = getattr(self, name)
+            grown = np.empty(capacity, dtype=column.dtype)
+            grown[:len(column)] = column
+            setattr(self, name, grown)
 
@@ -2,8 +2,9 @@
 Carbon observability layer for tracking emissions
 """
 
-from .carbon_tracker import CarbonTracker
+from .carbon_tracker import CarbonTracker, EmissionResult, TrackingSession
 from .metrics import MetricsCollector
+from .parquet_metrics import ParquetMetricsCollector
 
-__all__ = ['CarbonTracker', 'MetricsCollector']
+__all__ = ['CarbonTracker', 'EmissionResult', 'TrackingSession', 'MetricsCollector', 'ParquetMetricsCollector']
 
@@ -3,9 +3,90 @@ Carbon tracking using CodeCarbon
 """
 
 import os
-from typing import Dict, Optional
+from contextlib import contextmanager, suppress
+from dataclasses import dataclass
+from typing import Dict, Iterator, Optional
 from codecarbon import EmissionsTracker
-from datetime import datetime
+from carbon_intelligence.utils.clock import now_timestamp
+
+
+# CodeCarbon EmissionsData attributes behind EmissionResult's fields after
+# timestamp, in field order, with the default used when one is missing or None
+_EMISSIONS_DATA_FIELDS = (
+    ("emissions", 0),
+    ("energy_consumed", 0),
+    ("duration", 0),
+    ("cpu_power", 0),
+    ("gpu_power", 0),
+    ("ram_power", 0),
+    ("country_iso_code", "Unknown"),
+    ("region", "Unknown")
+)
+
+
+class _Starting:
+    """Placeholder held in active_trackers while a workload's tracker starts"""
+    __slots__ = ()
+
+
+@dataclass(slots=True, frozen=True)
+class EmissionResult:
+    """Emission metrics for one tracked run, as returned by stop_tracking"""
+    
+    workload_id: str
+    timestamp: str
+    emissions_kg: float
+    energy_consumed_kwh: float
+    duration_seconds: float
+    cpu_power_watts: float
+    gpu_power_watts: float
+    ram_power_watts: float
+    country_iso_code: str
+    region: str
+    
+    @classmethod
+    def from_emissions_data(cls, workload_id: str, emissions_data) -> "EmissionResult":
+        """
+        Build a result from CodeCarbon's EmissionsData
+        
+        Args:
+            workload_id: Unique identifier for the workload
+            emissions_data: EmissionsData from the stopped tracker, or None
+                if the tracker produced none
+            
+        Returns:
+            EmissionResult with defaults for any missing values
+        """
+        values = []
+        for attribute, default in _EMISSIONS_DATA_FIELDS:
+            value = getattr(emissions_data, attribute, None)
+            values.append(default if value is None else value)
+        return cls(workload_id, now_timestamp()[1], *values)
+    
+    def to_dict(self) -> Dict:
+        """Convert to dictionary"""
+        return {
+            "workload_id": self.workload_id,
+            "timestamp": self.timestamp,
+            "emissions_kg": self.emissions_kg,
+            "energy_consumed_kwh": self.energy_consumed_kwh,
+            "duration_seconds": self.duration_seconds,
+            "cpu_power_watts": self.cpu_power_watts,
+            "gpu_power_watts": self.gpu_power_watts,
+            "ram_power_watts": self.ram_power_watts,
+            "country_iso_code": self.country_iso_code,
+            "region": self.region
+        }
+
+
+@dataclass
+class TrackingSession:
+    """Handle for a CarbonTracker.track() block"""
+    
+    workload_id: str
+    
+    # Emission data from stop_tracking, set when the block exits normally
+    emissions: Optional[EmissionResult] = None
 
 
 class CarbonTracker:
@@ -30,19 +111,26 @@ class CarbonTracker:
             workload_id: Unique identifier for the workload
             project_name: Optional project name for organization
         """
-        if workload_id in self.active_trackers:
+        # Claim the slot with one lookup; released again if starting fails.
+        # Each call claims with its own placeholder so a concurrent start
+        # that is still in progress counts as active.
+        claim = _Starting()
+        if self.active_trackers.setdefault(workload_id, claim) is not claim:
             raise ValueError(f"Tracking already active for workload: {workload_id}")
         
-        tracker = EmissionsTracker(
-            project_name=project_name or workload_id,
-            output_dir=self.output_dir,
-            log_level="error"  # Reduce verbosity
-        )
-        
-        tracker.start()
+        try:
+            tracker = EmissionsTracker(
+                project_name=project_name or workload_id,
+                output_dir=self.output_dir,
+                log_level="error"  # Reduce verbosity
+            )
+            tracker.start()
+        except BaseException:
+            self.active_trackers.pop(workload_id, None)
+            raise
         self.active_trackers[workload_id] = tracker
     
-    def stop_tracking(self, workload_id: str) -> Dict:
+    def stop_tracking(self, workload_id: str) -> EmissionResult:
         """
         Stop tracking and return emission data
         
@@ -50,30 +138,49 @@ class CarbonTracker:
             workload_id: Unique identifier for the workload
             
         Returns:
-            Dictionary with emission metrics
+            EmissionResult with emission metrics (to_dict() for a dictionary)
         """
-        if workload_id not in self.active_trackers:
+        tracker = self.active_trackers.pop(workload_id, None)
+        if tracker is None or isinstance(tracker, _Starting):
+            # A tracker that is still starting is not active yet; leave its
+            # placeholder for start_tracking to replace
+            if tracker is not None:
+                self.active_trackers.setdefault(workload_id, tracker)
             raise ValueError(f"No active tracking for workload: {workload_id}")
         
-        tracker = self.active_trackers[workload_id]
-        emissions_data = tracker.stop()
+        # stop() only returns the emissions total; the full EmissionsData is
+        # kept on the tracker (and absent if stopping failed)
+        tracker.stop()
+        return EmissionResult.from_emissions_data(
+            workload_id, getattr(tracker, "final_emissions_data", None)
+        )
+    
+    @contextmanager
+    def track(self, workload_id: str, project_name: Optional[str] = None) -> Iterator[TrackingSession]:
+        """
+        Track emissions for the duration of a with block
         
-        # Extract key metrics
-        result = {
-            "workload_id": workload_id,
-            "timestamp": datetime.now().isoformat(),
-            "emissions_kg": emissions_data.get("emissions", 0),
-            "energy_consumed_kwh": emissions_data.get("energy_consumed", 0),
-            "duration_seconds": emissions_data.get("duration", 0),
-            "cpu_power_watts": emissions_data.get("cpu_power", 0),
-            "gpu_power_watts": emissions_data.get("gpu_power", 0),
-            "ram_power_watts": emissions_data.get("ram_power", 0),
-            "country_iso_code": emissions_data.get("country_iso_code", "Unknown"),
-            "region": emissions_data.get("region", "Unknown")
-        }
+        Tracking is stopped however the block exits. If the block raises,
+        that exception propagates and takes precedence over any error from
+        stopping the tracker.
         
-        del self.active_trackers[workload_id]
-        return result
+        Args:
+            workload_id: Unique identifier for the workload
+            project_name: Optional project name for organization
+            
+        Returns:
+            Context manager yielding a TrackingSession, whose emissions
+            attribute holds the stop_tracking result after the block
+        """
+        self.start_tracking(workload_id, project_name)
+        session = TrackingSession(workload_id)
+        try:
+            yield session
+        except BaseException:
+            with suppress(Exception):
+                self.stop_tracking(workload_id)
+            raise
+        session.emissions = self.stop_tracking(workload_id)
     
     def get_current_emissions(self, workload_id: str) -> Optional[Dict]:
         """
@@ -85,10 +192,10 @@ class CarbonTracker:
         Returns:
             Current emission estimate or None if not tracking
         """
-        if workload_id not in self.active_trackers:
+        tracker = self.active_trackers.get(workload_id)
+        if tracker is None or isinstance(tracker, _Starting):
             return None
         
-        tracker = self.active_trackers[workload_id]
         # CodeCarbon doesn't provide real-time estimates easily
         # This is a placeholder for future enhancement
         return {
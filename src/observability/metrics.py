@@ -2,25 +2,277 @@
 Metrics collection for workload monitoring
 """
 
-from typing import Dict, List, Optional
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+from contextlib import contextmanager
 from datetime import datetime, timedelta
+import glob
+import gzip
 import json
+import mmap
 import os
+import queue
+import shutil
+import threading
+import weakref
+
+import numpy as np
+
+from carbon_intelligence.utils.clock import now_timestamp
+
+try:
+    import orjson
+except ImportError:  # optional: faster (de)serialization of metrics files
+    orjson = None
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows: the log is not locked across processes
+    fcntl = None
+
+
+# Numeric columns kept per workload, in buffer row order
+_COLUMNS = ("timestamp", "emissions_kg", "energy_kwh", "duration_seconds")
+
+# Buffer rows after the _COLUMNS rows hold running totals of these columns
+# (row _TOTALS[k] is the cumulative sum of row k + 1)
+_TOTALS = slice(len(_COLUMNS), 2 * len(_COLUMNS) - 1)
+_BUFFER_ROWS = 2 * len(_COLUMNS) - 1
+
+# Records a workload's column buffer holds before its first growth
+_INITIAL_CAPACITY = 64
+
+# Significant digits kept for recorded emissions, energy and duration
+_SIGNIFICANT_DIGITS = 6
+
+# Default number of records kept in memory per workload
+DEFAULT_IN_MEMORY_CAP = 10_000
+
+# Size at which the plain-text metrics log is sealed into a gzip segment
+_SEAL_THRESHOLD_BYTES = 1024 * 1024
+
+# The background writer coalesces up to this many queued lines per write,
+# waiting at most this long for each further line
+_MAX_WRITE_BATCH = 256
+_COALESCE_SECONDS = 0.01
+
+# Queue item telling the background writer to exit
+_STOP = object()
+
+
+def _round_significant(value: float) -> float:
+    """Round a value to _SIGNIFICANT_DIGITS significant digits, as a float"""
+    return float(f"{float(value):.{_SIGNIFICANT_DIGITS}g}")
+
+
+def _encode_line(record: Dict) -> bytes:
+    """Serialize a record as one compact, newline-terminated JSON line"""
+    if orjson is not None:
+        return orjson.dumps(record, option=orjson.OPT_APPEND_NEWLINE | orjson.OPT_NON_STR_KEYS)
+    return (json.dumps(record, separators=(',', ':')) + '\n').encode()
+
+
+def _decode(line: Union[bytes, memoryview]) -> Dict:
+    """Parse one JSON line"""
+    if orjson is not None:
+        return orjson.loads(line)
+    return json.loads(bytes(line))
+
+
+def _read_lines(file_path: str) -> Iterator[Union[bytes, memoryview]]:
+    """
+    Iterate over the lines of a metrics file, without line terminators
+    
+    Plain files are memory-mapped and each line is yielded as a memoryview
+    into the mapping, so no per-line copy is made; a yielded view is only
+    valid until the next one is requested. Gzip segments are streamed.
+    """
+    if file_path.endswith(".gz"):
+        with gzip.open(file_path, 'rb') as f:
+            for line in f:
+                yield line.rstrip(b"\n")
+        return
+    
+    with open(file_path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            with memoryview(mapped) as view:
+                size = len(mapped)
+                start = 0
+                while start < size:
+                    end = mapped.find(b"\n", start)
+                    if end == -1:
+                        end = size
+                    line = view[start:end]
+                    yield line
+                    line.release()
+                    start = end + 1
+
+
+def _log_path(storage_path: str) -> str:
+    """Path of the shared JSON Lines metrics log"""
+    return os.path.join(storage_path, "metrics.jsonl")
+
+
+def _segment_paths(storage_path: str) -> List[str]:
+    """Paths of the sealed gzip segments of the log, oldest first"""
+    return sorted(glob.glob(os.path.join(glob.escape(storage_path), "metrics.*.jsonl.gz")))
+
+
+@contextmanager
+def _log_lock(storage_path: str, exclusive: bool) -> Iterator[None]:
+    """
+    Hold the storage directory's log lock
+    
+    Appending to or reading the log takes the lock shared; sealing takes it
+    exclusively, so processes sharing a directory never write to or read a
+    log that is being rotated. Without fcntl (Windows) this is a no-op.
+    """
+    if fcntl is None:
+        yield
+        return
+    with open(os.path.join(storage_path, "metrics.lock"), 'a') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def _is_current_log(log_file, storage_path: str) -> bool:
+    """Whether an open log file is still the directory's metrics.jsonl"""
+    try:
+        return os.stat(_log_path(storage_path)).st_ino == os.fstat(log_file.fileno()).st_ino
+    except FileNotFoundError:
+        return False
+
+
+def _seal_log(storage_path: str) -> None:
+    """
+    Compress the plain-text log into the next gzip segment
+    
+    Call with the log lock held exclusively. The segment is numbered after
+    the highest existing one and linked into place, which fails rather than
+    overwriting if that name is already taken.
+    """
+    file_path = _log_path(storage_path)
+    if not os.path.exists(file_path):
+        return
+    
+    # Write under a temporary name so a partial segment is never read
+    tmp_path = os.path.join(storage_path, f"metrics.sealing.{os.getpid()}.tmp")
+    with open(file_path, 'rb') as src, gzip.open(tmp_path, 'wb') as dst:
+        shutil.copyfileobj(src, dst)
+    
+    names = (os.path.basename(path).split(".")[1] for path in _segment_paths(storage_path))
+    index = max((int(name) for name in names if name.isdigit()), default=-1) + 1
+    while True:
+        try:
+            os.link(tmp_path, os.path.join(storage_path, f"metrics.{index:06d}.jsonl.gz"))
+            break
+        except FileExistsError:
+            index += 1
+    os.remove(tmp_path)
+    os.remove(file_path)
+
+
+def _write_log(lines: queue.SimpleQueue, storage_path: str) -> None:
+    """
+    Background writer loop for MetricsCollector
+    
+    Appends queued lines to the log, one write and fsync per coalesced
+    batch, and seals the log once it reaches _SEAL_THRESHOLD_BYTES. The log
+    is reopened whenever another process sharing the directory has sealed
+    it. Queued threading.Events are set once everything queued before them
+    is on disk. Exits after _STOP.
+    """
+    log_file = None
+    while True:
+        batch = [lines.get()]
+        while len(batch) < _MAX_WRITE_BATCH:
+            try:
+                batch.append(lines.get(timeout=_COALESCE_SECONDS))
+            except queue.Empty:
+                break
+        
+        data = b"".join(item for item in batch if isinstance(item, bytes))
+        if data:
+            with _log_lock(storage_path, exclusive=False):
+                if log_file is not None and not _is_current_log(log_file, storage_path):
+                    log_file.close()
+                    log_file = None
+                if log_file is None:
+                    log_file = open(_log_path(storage_path), 'ab')
+                log_file.write(data)
+                log_file.flush()
+                os.fsync(log_file.fileno())
+                size = os.fstat(log_file.fileno()).st_size
+            if size >= _SEAL_THRESHOLD_BYTES:
+                log_file.close()
+                log_file = None
+                with _log_lock(storage_path, exclusive=True):
+                    # Another process may have sealed it in the meantime
+                    log_path = _log_path(storage_path)
+                    if os.path.exists(log_path) and os.path.getsize(log_path) >= _SEAL_THRESHOLD_BYTES:
+                        _seal_log(storage_path)
+        
+        for item in batch:
+            if isinstance(item, threading.Event):
+                item.set()
+        
+        if any(item is _STOP for item in batch):
+            if log_file is not None:
+                log_file.close()
+            return
+
+
+def _stop_writer(lines: queue.SimpleQueue, writer: threading.Thread) -> None:
+    """Drain and stop a background writer"""
+    lines.put(_STOP)
+    writer.join()
 
 
 class MetricsCollector:
-    """Collects and stores workload execution metrics"""
+    """
+    Collects and stores workload execution metrics
+    
+    Records from all workloads are appended to one log file, metrics.jsonl,
+    by a background thread that batches writes; record_execution only
+    queues the serialized line. flush() waits until queued records are on
+    disk, and close() (also run at interpreter exit) stops the writer.
     
-    def __init__(self, storage_path: str = "./metrics_data"):
+    At most in_memory_cap records per workload are kept in memory; the
+    oldest are dropped a quarter of the cap at a time. Queries whose window
+    reaches past the dropped records are answered from disk instead.
+    """
+    
+    def __init__(self,
+                 storage_path: str = "./metrics_data",
+                 in_memory_cap: Optional[int] = DEFAULT_IN_MEMORY_CAP):
         """
         Initialize metrics collector
         
         Args:
             storage_path: Directory to store metrics
+            in_memory_cap: Records kept in memory per workload (None for no limit)
         """
+        if in_memory_cap is not None and in_memory_cap < 1:
+            raise ValueError("in_memory_cap must be at least 1")
         self.storage_path = storage_path
         os.makedirs(storage_path, exist_ok=True)
+        self.in_memory_cap = in_memory_cap
         self.metrics: Dict[str, List[Dict]] = {}
+        # POSIX time of the newest record dropped from memory, per workload
+        self._dropped_until: Dict[str, float] = {}
+        # Background writer for the shared log, started on the first write
+        self._write_queue: Optional[queue.SimpleQueue] = None
+        self._writer: Optional[threading.Thread] = None
+        self._writer_finalizer: Optional[weakref.finalize] = None
+        # Numeric fields per workload as a (_BUFFER_ROWS, capacity) buffer, one
+        # contiguous row per column followed by running totals of the value
+        # columns; the first _lengths[wid] slots are used
+        self._columns: Dict[str, np.ndarray] = {}
+        self._lengths: Dict[str, int] = {}
     
     def record_execution(self, 
                        workload_id: str,
@@ -31,6 +283,9 @@ class MetricsCollector:
         """
         Record a workload execution
         
+        Values are stored rounded to _SIGNIFICANT_DIGITS significant digits,
+        which keeps persisted records short without losing small runs.
+        
         Args:
             workload_id: Unique identifier for the workload
             emissions_kg: CO₂ emissions in kg
@@ -38,8 +293,12 @@ class MetricsCollector:
             energy_kwh: Energy consumed in kWh
             metadata: Additional metadata
         """
+        emissions_kg = _round_significant(emissions_kg)
+        duration_seconds = _round_significant(duration_seconds)
+        energy_kwh = _round_significant(energy_kwh)
+        timestamp, iso_timestamp = now_timestamp()
         record = {
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": iso_timestamp,
             "emissions_kg": emissions_kg,
             "duration_seconds": duration_seconds,
             "energy_kwh": energy_kwh,
@@ -50,9 +309,14 @@ class MetricsCollector:
             self.metrics[workload_id] = []
         
         self.metrics[workload_id].append(record)
+        self._append_row(workload_id, (timestamp, emissions_kg, energy_kwh, duration_seconds))
+        if self.in_memory_cap is not None and self._lengths[workload_id] > self.in_memory_cap:
+            self._drop_oldest(
+                workload_id, self._lengths[workload_id] - max(1, self.in_memory_cap * 3 // 4)
+            )
         
         # Persist to disk
-        self._save_metrics(workload_id)
+        self._save_metrics(workload_id, record)
     
     def get_workload_history(self, workload_id: str, days: int = 30) -> List[Dict]:
         """
@@ -65,18 +329,24 @@ class MetricsCollector:
         Returns:
             List of execution records
         """
-        if workload_id not in self.metrics:
-            return []
-        
-        cutoff_date = datetime.now() - timedelta(days=days)
-        history = []
-        
-        for record in self.metrics[workload_id]:
-            record_date = datetime.fromisoformat(record["timestamp"])
-            if record_date >= cutoff_date:
-                history.append(record)
+        cutoff = (datetime.now() - timedelta(days=days)).timestamp()
+        return self._history_since(workload_id, cutoff)
+    
+    def get_workload_history_bulk(self,
+                                  workload_ids: Iterable[str],
+                                  days: int = 30) -> Dict[str, List[Dict]]:
+        """
+        Get execution history for several workloads in one call
         
-        return sorted(history, key=lambda x: x["timestamp"])
+        Args:
+            workload_ids: Workload identifiers to fetch
+            days: Number of days of history to retrieve
+            
+        Returns:
+            Dictionary mapping workload ID to its list of execution records
+        """
+        cutoff = (datetime.now() - timedelta(days=days)).timestamp()
+        return {wid: self._history_since(wid, cutoff) for wid in workload_ids}
     
     def get_aggregate_stats(self, workload_id: str, days: int = 30) -> Dict:
         """
@@ -89,9 +359,65 @@ class MetricsCollector:
         Returns:
             Aggregate statistics
         """
-        history = self.get_workload_history(workload_id, days)
+        cutoff = (datetime.now() - timedelta(days=days)).timestamp()
+        return self._stats_since(workload_id, cutoff, days)
+    
+    def get_aggregate_stats_bulk(self,
+                                 workload_ids: Iterable[str],
+                                 days: int = 30) -> Dict[str, Dict]:
+        """
+        Get aggregate statistics for several workloads in one call
         
-        if not history:
+        Args:
+            workload_ids: Workload identifiers to aggregate
+            days: Number of days to aggregate
+            
+        Returns:
+            Dictionary mapping workload ID to its aggregate statistics
+        """
+        cutoff = (datetime.now() - timedelta(days=days)).timestamp()
+        return {wid: self._stats_since(wid, cutoff, days) for wid in workload_ids}
+    
+    def _history_since(self, workload_id: str, cutoff: float) -> List[Dict]:
+        """Records for a workload at or after the POSIX time cutoff, oldest first"""
+        if self._needs_disk(workload_id, cutoff):
+            return self._read_since(workload_id, cutoff)[0]
+        if workload_id not in self.metrics:
+            return []
+        return self.metrics[workload_id][self._window_start(workload_id, cutoff):]
+    
+    def _stats_since(self, workload_id: str, cutoff: float, days: int) -> Dict:
+        """Aggregate statistics over records at or after the POSIX time cutoff"""
+        if self._needs_disk(workload_id, cutoff):
+            records = self._read_since(workload_id, cutoff)[0]
+            return self._stats_dict(
+                len(records),
+                sum(r["emissions_kg"] for r in records),
+                sum(r["energy_kwh"] for r in records),
+                sum(r["duration_seconds"] for r in records),
+                days
+            )
+        
+        n = self._lengths.get(workload_id, 0)
+        start = self._window_start(workload_id, cutoff)
+        count = n - start
+        if count == 0:
+            return self._stats_dict(0, 0.0, 0.0, 0.0, days)
+        
+        # Window sums are differences of running totals
+        totals = self._columns[workload_id][_TOTALS]
+        window = totals[:, n - 1] - totals[:, start - 1] if start else totals[:, n - 1]
+        total_emissions, total_energy, total_duration = (float(v) for v in window)
+        return self._stats_dict(count, total_emissions, total_energy, total_duration, days)
+    
+    def _stats_dict(self,
+                    count: int,
+                    total_emissions: float,
+                    total_energy: float,
+                    total_duration: float,
+                    days: int) -> Dict:
+        """Aggregate statistics dictionary for a window of count records"""
+        if count == 0:
             return {
                 "total_executions": 0,
                 "total_emissions_kg": 0,
@@ -100,29 +426,226 @@ class MetricsCollector:
                 "avg_duration_seconds": 0
             }
         
-        total_emissions = sum(r["emissions_kg"] for r in history)
-        total_energy = sum(r["energy_kwh"] for r in history)
-        avg_duration = sum(r["duration_seconds"] for r in history) / len(history)
+        avg_duration = total_duration / count
         
         return {
-            "total_executions": len(history),
+            "total_executions": count,
             "total_emissions_kg": total_emissions,
             "total_energy_kwh": total_energy,
-            "avg_emissions_per_run_kg": total_emissions / len(history),
+            "avg_emissions_per_run_kg": total_emissions / count,
             "avg_duration_seconds": avg_duration,
             "period_days": days
         }
     
-    def _save_metrics(self, workload_id: str) -> None:
-        """Save metrics to disk"""
-        file_path = os.path.join(self.storage_path, f"{workload_id}_metrics.json")
-        with open(file_path, 'w') as f:
-            json.dump(self.metrics[workload_id], f, indent=2)
+    def _needs_disk(self, workload_id: str, cutoff: float) -> bool:
+        """Whether records at or after cutoff were dropped from memory"""
+        dropped_until = self._dropped_until.get(workload_id)
+        return dropped_until is not None and cutoff <= dropped_until
+    
+    def _read_since(self, workload_id: str, cutoff: float) -> Tuple[List[Dict], List[float]]:
+        """Persisted records (and their POSIX times) at or after cutoff, oldest first"""
+        records, timestamps = self._read_persisted([workload_id]).get(workload_id, ([], None))
+        if timestamps is None:
+            timestamps = [datetime.fromisoformat(r["timestamp"]).timestamp() for r in records]
+        start = int(np.searchsorted(np.asarray(timestamps, dtype=np.float64), cutoff, side="left"))
+        return records[start:], timestamps[start:]
+    
+    def _window_start(self, workload_id: str, cutoff: float) -> int:
+        """Index of a workload's first record at or after the POSIX time cutoff"""
+        n = self._lengths.get(workload_id, 0)
+        if n == 0:
+            return 0
+        # Records are kept in time order, so the window is a suffix
+        timestamps = self._columns[workload_id][0, :n]
+        return int(np.searchsorted(timestamps, cutoff, side="left"))
+    
+    def last_execution_ts(self, workload_id: str) -> Optional[float]:
+        """
+        Get the time of a workload's most recent recorded execution
+        
+        Args:
+            workload_id: Unique identifier for the workload
+            
+        Returns:
+            POSIX timestamp of the latest record, or None if there is none
+        """
+        n = self._lengths.get(workload_id, 0)
+        return float(self._columns[workload_id][0, n - 1]) if n else None
+    
+    def as_arrays(self, workload_id: str) -> Dict[str, np.ndarray]:
+        """
+        Get a workload's numeric metrics as column arrays
+        
+        The arrays are read-only views of the collector's buffers and keep
+        describing the records present when they were taken.
+        
+        Args:
+            workload_id: Unique identifier for the workload
+            
+        Returns:
+            Dictionary mapping "timestamp" (POSIX seconds), "emissions_kg",
+            "energy_kwh" and "duration_seconds" to float64 arrays
+        """
+        n = self._lengths.get(workload_id, 0)
+        buffer = self._columns.get(workload_id)
+        if buffer is None:
+            buffer = np.empty((len(_COLUMNS), 0), dtype=np.float64)
+        
+        arrays = {}
+        for i, name in enumerate(_COLUMNS):
+            column = buffer[i, :n]
+            column.flags.writeable = False
+            arrays[name] = column
+        return arrays
+    
+    def _append_row(self, workload_id: str, row: Sequence[float]) -> None:
+        """Append one record's numeric fields, doubling the buffer when full"""
+        n = self._lengths.get(workload_id, 0)
+        buffer = self._columns.get(workload_id)
+        if buffer is None:
+            buffer = np.empty((_BUFFER_ROWS, _INITIAL_CAPACITY), dtype=np.float64)
+            self._columns[workload_id] = buffer
+        elif n == buffer.shape[1]:
+            grown = np.empty((_BUFFER_ROWS, 2 * n), dtype=np.float64)
+            grown[:, :n] = buffer
+            buffer = self._columns[workload_id] = grown
+        
+        buffer[:len(_COLUMNS), n] = row
+        buffer[_TOTALS, n] = buffer[1:len(_COLUMNS), n]
+        if n:
+            buffer[_TOTALS, n] += buffer[_TOTALS, n - 1]
+        self._lengths[workload_id] = n + 1
+    
+    def _drop_oldest(self, workload_id: str, count: int) -> None:
+        """Drop a workload's oldest in-memory records (they stay on disk)"""
+        n = self._lengths[workload_id]
+        buffer = self._columns[workload_id]
+        self._dropped_until[workload_id] = float(buffer[0, count - 1])
+        del self.metrics[workload_id][:count]
+        
+        # Copy into a new buffer so views handed out by as_arrays stay valid,
+        # rebasing the running totals onto the first kept record
+        kept = np.empty_like(buffer)
+        kept[:, :n - count] = buffer[:, count:n]
+        kept[_TOTALS, :n - count] -= buffer[_TOTALS, count - 1:count]
+        self._columns[workload_id] = kept
+        self._lengths[workload_id] = n - count
+    
+    def flush(self) -> None:
+        """Wait until every queued record has been written to disk"""
+        if self._writer is not None:
+            done = threading.Event()
+            self._write_queue.put(done)
+            while not done.wait(timeout=1.0):
+                if not self._writer.is_alive():
+                    raise RuntimeError("Metrics writer thread stopped before flushing")
+    
+    def close(self) -> None:
+        """Write out queued records and stop the background writer"""
+        self.flush()
+        if self._writer_finalizer is not None:
+            self._writer_finalizer()
+            self._write_queue = self._writer = self._writer_finalizer = None
+    
+    def load_metrics(self, workload_ids: Optional[Iterable[str]] = None) -> None:
+        """
+        Load persisted metrics into memory
+        
+        The sealed segments are streamed and the plain log memory-mapped,
+        each read once, with records bucketed by workload.
+        
+        Args:
+            workload_ids: Workloads to load (all workloads if omitted)
+        """
+        for workload_id, (records, timestamps) in self._read_persisted(workload_ids).items():
+            self._set_records(workload_id, records, timestamps)
+    
+    def _read_persisted(self,
+                        workload_ids: Optional[Iterable[str]] = None
+                        ) -> Dict[str, Tuple[List[Dict], Optional[List[float]]]]:
+        """
+        Read persisted records, oldest first, after flushing queued ones
+        
+        Args:
+            workload_ids: Workloads to read (all workloads if omitted)
+            
+        Returns:
+            Dictionary mapping workload ID to its records and their POSIX
+            times (None when the caller has to parse the ISO timestamps)
+        """
+        wanted = set(workload_ids) if workload_ids is not None else None
+        self.flush()
+        
+        loaded: Dict[str, Tuple[List[Dict], Optional[List[float]]]] = {}
+        with _log_lock(self.storage_path, exclusive=False):
+            for file_path in _segment_paths(self.storage_path) + [_log_path(self.storage_path)]:
+                if not os.path.exists(file_path):
+                    continue
+                for line in _read_lines(file_path):
+                    if not len(line):
+                        continue
+                    record = _decode(line)
+                    workload_id = record.pop("workload_id")
+                    if wanted is None or workload_id in wanted:
+                        loaded.setdefault(workload_id, ([], None))[0].append(record)
+        return loaded
+    
+    def _save_metrics(self, workload_id: str, record: Dict) -> None:
+        """Queue one record for the background writer"""
+        if self._writer is None:
+            self._start_writer()
+        self._write_queue.put(_encode_line({"workload_id": workload_id, **record}))
+    
+    def _start_writer(self) -> None:
+        """Start the background writer thread for the shared log"""
+        self._write_queue = queue.SimpleQueue()
+        self._writer = threading.Thread(
+            target=_write_log,
+            args=(self._write_queue, self.storage_path),
+            name="metrics-writer",
+            daemon=True
+        )
+        self._writer.start()
+        # Stops the writer on close(), garbage collection or interpreter exit
+        self._writer_finalizer = weakref.finalize(
+            self, _stop_writer, self._write_queue, self._writer
+        )
     
     def _load_metrics(self, workload_id: str) -> None:
         """Load metrics from disk"""
-        file_path = os.path.join(self.storage_path, f"{workload_id}_metrics.json")
-        if os.path.exists(file_path):
-            with open(file_path, 'r') as f:
-                self.metrics[workload_id] = json.load(f)
-
+        self.load_metrics([workload_id])
+    
+    def _set_records(self,
+                     workload_id: str,
+                     records: List[Dict],
+                     timestamps: Optional[List[float]] = None) -> None:
+        """
+        Replace a workload's in-memory records with records read from disk
+        
+        Only the newest in_memory_cap records are kept.
+        
+        Args:
+            workload_id: Unique identifier for the workload
+            records: Execution records, oldest first
+            timestamps: POSIX times of the records, if the reader already has
+                them (parsed from the ISO strings otherwise)
+        """
+        if timestamps is None:
+            timestamps = [datetime.fromisoformat(r["timestamp"]).timestamp() for r in records]
+        
+        self._dropped_until.pop(workload_id, None)
+        if self.in_memory_cap is not None and len(records) > self.in_memory_cap:
+            dropped = len(records) - self.in_memory_cap
+            self._dropped_until[workload_id] = timestamps[dropped - 1]
+            records, timestamps = records[dropped:], timestamps[dropped:]
+        self.metrics[workload_id] = records
+        
+        n = len(records)
+        buffer = np.empty((_BUFFER_ROWS, max(n, _INITIAL_CAPACITY)), dtype=np.float64)
+        buffer[:len(_COLUMNS), :n] = np.array([
+            (ts, r["emissions_kg"], r["energy_kwh"], r["duration_seconds"])
+            for ts, r in zip(timestamps, records)
+        ], dtype=np.float64).reshape(n, len(_COLUMNS)).T
+        np.cumsum(buffer[1:len(_COLUMNS), :n], axis=1, out=buffer[_TOTALS, :n])
+        self._columns[workload_id] = buffer
+        self._lengths[workload_id] = n
@@ -0,0 +1,146 @@
+"""
+Columnar (Parquet) persistence for workload metrics
+"""
+
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from datetime import datetime
+import itertools
+import json
+import os
+import weakref
+
+from carbon_intelligence.observability.metrics import DEFAULT_IN_MEMORY_CAP, MetricsCollector
+
+
+def _rows_table(rows: List[tuple]):
+    """Arrow table of buffered (timestamp, workload_id, ...) rows"""
+    import pyarrow as pa
+    
+    columns = list(zip(*rows)) if rows else [()] * 6
+    return pa.table(
+        {
+            "timestamp": pa.array(columns[0], type=pa.timestamp("us")),
+            "workload_id": pa.array(columns[1], type=pa.string()).dictionary_encode(),
+            "emissions_kg": pa.array(columns[2], type=pa.float64()),
+            "duration_seconds": pa.array(columns[3], type=pa.float64()),
+            "energy_kwh": pa.array(columns[4], type=pa.float64()),
+            "metadata": pa.array(columns[5], type=pa.string())
+        }
+    )
+
+
+def _write_parquet(rows: List[tuple], storage_path: str, file_seq: Iterator[int]) -> None:
+    """
+    Write buffered rows to a new Parquet file and clear the buffer
+    
+    A module-level function so the exit-time finalizer can run it without
+    keeping the collector alive.
+    """
+    if not rows:
+        return
+    
+    import pyarrow.parquet as pq
+    
+    day = rows[0][0].strftime("%Y%m%d")
+    while True:
+        file_path = os.path.join(storage_path, f"metrics-{day}-{next(file_seq):06d}.parquet")
+        if not os.path.exists(file_path):
+            break
+    pq.write_table(_rows_table(rows), file_path + ".tmp", compression="zstd")
+    os.replace(file_path + ".tmp", file_path)
+    rows.clear()
+
+
+class ParquetMetricsCollector(MetricsCollector):
+    """
+    Metrics collector that persists records as Parquet files
+    
+    Records from all workloads are buffered and written together as one
+    zstd-compressed Parquet file per batch, named by day
+    (metrics-YYYYMMDD-NNNNNN.parquet). Queries are answered from memory
+    exactly as in MetricsCollector; the files are read back with
+    load_metrics, which pushes the workload filter down to the reader and
+    includes records still in the buffer.
+    
+    The buffer is written out every batch_size records, on flush() or
+    close(), and at interpreter exit.
+    """
+    
+    def __init__(self,
+                 storage_path: str = "./metrics_data",
+                 batch_size: int = 1024,
+                 in_memory_cap: Optional[int] = DEFAULT_IN_MEMORY_CAP):
+        """
+        Initialize metrics collector
+        
+        Args:
+            storage_path: Directory to store metrics
+            batch_size: Number of buffered records that triggers a flush
+            in_memory_cap: Records kept in memory per workload (None for no limit)
+        """
+        super().__init__(storage_path, in_memory_cap)
+        self.batch_size = batch_size
+        self._buffer: List[tuple] = []
+        self._file_seq = itertools.count(1)
+        # Writes out the buffer on garbage collection or interpreter exit
+        self._buffer_finalizer = weakref.finalize(
+            self, _write_parquet, self._buffer, self.storage_path, self._file_seq
+        )
+    
+    def flush(self) -> None:
+        """Write all buffered records to a new Parquet file"""
+        _write_parquet(self._buffer, self.storage_path, self._file_seq)
+    
+    def _read_persisted(self,
+                        workload_ids: Optional[Iterable[str]] = None
+                        ) -> Dict[str, Tuple[List[Dict], Optional[List[float]]]]:
+        """Read flushed and buffered records, pushing the workload filter down"""
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        
+        wanted = set(workload_ids) if workload_ids is not None else None
+        
+        # Buffered records are merged in rather than flushed, so reads do not
+        # leave behind a small file each
+        tables = [_rows_table([row for row in self._buffer if wanted is None or row[1] in wanted])]
+        paths = self._parquet_paths()
+        if paths:
+            filters = [("workload_id", "in", list(wanted))] if wanted is not None else None
+            tables.insert(0, pq.read_table(paths, filters=filters))
+        table = pa.concat_tables(tables, promote_options="permissive").sort_by("timestamp")
+        
+        # The reader already returns datetimes, so keep their POSIX times
+        # rather than re-parsing the ISO strings in _set_records
+        loaded: Dict[str, Tuple[List[Dict], List[float]]] = {}
+        for row in table.to_pylist():
+            records, timestamps = loaded.setdefault(row["workload_id"], ([], []))
+            records.append({
+                "timestamp": row["timestamp"].isoformat(),
+                "emissions_kg": row["emissions_kg"],
+                "duration_seconds": row["duration_seconds"],
+                "energy_kwh": row["energy_kwh"],
+                "metadata": json.loads(row["metadata"])
+            })
+            timestamps.append(row["timestamp"].timestamp())
+        return loaded
+    
+    def _save_metrics(self, workload_id: str, record: Dict) -> None:
+        """Buffer one record, flushing once batch_size records are pending"""
+        self._buffer.append((
+            datetime.fromisoformat(record["timestamp"]),
+            workload_id,
+            record["emissions_kg"],
+            record["duration_seconds"],
+            record["energy_kwh"],
+            json.dumps(record["metadata"], separators=(',', ':'))
+        ))
+        if len(self._buffer) >= self.batch_size:
+            self.flush()
+    
+    def _parquet_paths(self) -> List[str]:
+        """Paths of all flushed Parquet files, oldest first"""
+        return sorted(
+            os.path.join(self.storage_path, name)
+            for name in os.listdir(self.storage_path)
+            if name.startswith("metrics-") and name.endswith(".parquet")
+        )
@@ -2,7 +2,6 @@
 Utility functions
 """
 
-from .scoring import calculate_carbon_efficiency_score
-
-__all__ = ['calculate_carbon_efficiency_score']
+from .scoring import calculate_carbon_efficiency_score, calculate_carbon_efficiency_scores_batch
 
+__all__ = ['calculate_carbon_efficiency_score', 'calculate_carbon_efficiency_scores_batch']
@@ -0,0 +1,37 @@
+"""
+Wall-clock timestamps for record paths
+"""
+
+import time
+from datetime import datetime
+from typing import Optional, Tuple
+
+
+# Last POSIX second formatted by now_timestamp, with its local ISO 8601 string
+_formatted_second: Tuple[Optional[int], str] = (None, "")
+
+
+def now_timestamp() -> Tuple[float, str]:
+    """
+    Get the current local time as a POSIX timestamp and an ISO 8601 string
+    
+    Gives the same values as datetime.now().timestamp() and
+    datetime.now().isoformat() from one clock read, formatting the
+    date-time part only once per second.
+    
+    Returns:
+        Tuple of (POSIX timestamp, ISO 8601 string)
+    """
+    global _formatted_second
+    second, microsecond = divmod(time.time_ns() // 1000, 1_000_000)
+    cached_second, prefix = _formatted_second
+    if second != cached_second:
+        prefix = datetime.fromtimestamp(second).isoformat()
+        _formatted_second = (second, prefix)
+    
+    # Same arithmetic as datetime.timestamp(), so a reparsed string gives
+    # back exactly this timestamp
+    timestamp = second + microsecond / 1e6
+    if microsecond:
+        return timestamp, f"{prefix}.{microsecond:06d}"
+    return timestamp, prefix
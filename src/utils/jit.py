@@ -0,0 +1,29 @@
+"""
+Optional Numba JIT support
+
+Numba is an optional dependency. When it is not installed, ``njit`` is a
+no-op decorator and ``prange`` is ``range``, so kernels written for Numba
+still run (as plain NumPy/Python) without it.
+
+Parallel kernels prefer the OpenMP threading layer over TBB: once a TBB
+pool has been started from a non-main thread (as Streamlit and thread-pool
+callers do), the interpreter hangs at exit. NUMBA_THREADING_LAYER or
+NUMBA_THREADING_LAYER_PRIORITY in the environment still take precedence.
+"""
+
+import os
+
+try:
+    from numba import config, njit, prange
+    NUMBA_AVAILABLE = True
+    if "NUMBA_THREADING_LAYER_PRIORITY" not in os.environ:
+        config.THREADING_LAYER_PRIORITY = ["omp", "workqueue", "tbb"]
+except ImportError:  # pragma: no cover - depends on the environment
+    NUMBA_AVAILABLE = False
+    prange = range
+    
+    def njit(*args, **kwargs):
+        """No-op stand-in for numba.njit"""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
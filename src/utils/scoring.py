@@ -2,8 +2,20 @@
 Carbon Efficiency Score calculation
 """
 
-from typing import Dict
-from src.context.execution_context import WorkloadContext, CriticalityLevel, UrgencyLevel
+from typing import Dict, List, Tuple, Union
+
+import numpy as np
+
+from carbon_intelligence.context.execution_context import WorkloadContext
+from carbon_intelligence.utils.jit import njit
+
+
+# Business value weights, indexed by CriticalityLevel / UrgencyLevel code
+# (CRITICAL / REAL_TIME = 0 ... DEFERRABLE = 4)
+_CRITICALITY_WEIGHTS = (1.0, 0.8, 0.6, 0.4, 0.2)
+_URGENCY_WEIGHTS = (1.0, 0.8, 0.6, 0.4, 0.2)
+_CRITICALITY_WEIGHT_ARRAY = np.array(_CRITICALITY_WEIGHTS)
+_URGENCY_WEIGHT_ARRAY = np.array(_URGENCY_WEIGHTS)
 
 
 def calculate_carbon_efficiency_score(
@@ -26,56 +38,126 @@ def calculate_carbon_efficiency_score(
         Dictionary with CES score and breakdown
     """
     # Business value component (higher criticality/urgency = higher value)
-    criticality_weights = {
-        CriticalityLevel.CRITICAL: 1.0,
-        CriticalityLevel.HIGH: 0.8,
-        CriticalityLevel.MEDIUM: 0.6,
-        CriticalityLevel.LOW: 0.4,
-        CriticalityLevel.DEFERRABLE: 0.2
-    }
-    
-    urgency_weights = {
-        UrgencyLevel.REAL_TIME: 1.0,
-        UrgencyLevel.URGENT: 0.8,
-        UrgencyLevel.NORMAL: 0.6,
-        UrgencyLevel.BATCH: 0.4,
-        UrgencyLevel.DEFERRABLE: 0.2
-    }
-    
-    business_value = (
-        criticality_weights.get(workload.criticality, 0.5) * 0.6 +
-        urgency_weights.get(workload.urgency, 0.5) * 0.4
-    )
+    criticality_weight = _CRITICALITY_WEIGHTS[workload.criticality]
+    urgency_weight = _URGENCY_WEIGHTS[workload.urgency]
+    business_value = criticality_weight * 0.6 + urgency_weight * 0.4
     
-    # Carbon intensity component (lower emissions = better)
-    # Normalize emissions (assuming typical range 0.001-1.0 kg per run)
-    normalized_emissions = min(emissions_per_run_kg / 1.0, 1.0)  # Cap at 1.0 kg
-    carbon_intensity_score = 1.0 - normalized_emissions
+    # Carbon intensity component (lower emissions = better), with emissions
+    # normalized against a 1.0 kg cap (typical range 0.001-1.0 kg per run)
+    carbon_intensity_score = 1.0 - min(emissions_per_run_kg, 1.0)
     
-    # Frequency alignment component (better alignment = better score)
+    # Frequency alignment component (better alignment = better score).
+    # Over-serving (ratio >= 1) loses half a point per unit of excess;
+    # under-serving (ratio < 1, may miss SLAs) scores the ratio itself.
+    # Below 1 the over-serving term exceeds 1 > ratio, so min() selects
+    # the right branch without an if/else.
     frequency_ratio = workload.get_frequency_ratio()
-    if frequency_ratio >= 1.0:
-        # Over-serving - reduces score
-        alignment_score = max(0.0, 1.0 - (frequency_ratio - 1.0) * 0.5)
-    else:
-        # Under-serving - also reduces score (may miss SLAs)
-        alignment_score = frequency_ratio
-    
-    # Optimization potential component (higher potential = lower score)
-    optimization_penalty = optimization_potential * 0.3
+    alignment_score = min(frequency_ratio, max(0.0, 1.0 - (frequency_ratio - 1.0) * 0.5))
     
-    # Calculate composite score
-    # Weighted combination of components
-    ces = (
+    # Composite score: weighted combination of the components, with higher
+    # optimization potential lowering the score, normalized to 0-100
+    ces_normalized = (
         business_value * 0.4 +
         carbon_intensity_score * 0.3 +
         alignment_score * 0.2 +
-        (1.0 - optimization_penalty) * 0.1
+        (1.0 - optimization_potential * 0.3) * 0.1
+    ) * 100
+    
+    return _score_dict(
+        ces_normalized,
+        business_value,
+        carbon_intensity_score,
+        alignment_score,
+        optimization_potential,
+        criticality_weight,
+        urgency_weight,
+        emissions_per_run_kg,
+        frequency_ratio
     )
+
+
+def calculate_carbon_efficiency_scores_batch(
+    criticality: np.ndarray,
+    urgency: np.ndarray,
+    emissions_per_run_kg: np.ndarray,
+    frequency_ratio: np.ndarray,
+    optimization_potential: np.ndarray,
+    as_dicts: bool = False
+) -> Union[Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray], List[Dict]]:
+    """
+    Calculate Carbon Efficiency Scores for many workloads at once
+    
+    Same formula as calculate_carbon_efficiency_score, one array element
+    per workload, evaluated in float64 so scores match exactly.
+    
+    Args:
+        criticality: CriticalityLevel codes (e.g. np.fromiter over w.criticality)
+        urgency: UrgencyLevel codes
+        emissions_per_run_kg: Average emissions per execution in kg CO₂
+        frequency_ratio: Required / current frequency ratio
+        optimization_potential: Estimated optimization potential (0-1)
+        as_dicts: Return one calculate_carbon_efficiency_score-style
+            dictionary per workload instead of arrays
+        
+    Returns:
+        Tuple of unrounded (ces_score, business_value, carbon_intensity_score,
+        alignment_score) arrays, or a list of dictionaries if as_dicts is set
+    """
+    criticality_weight = _CRITICALITY_WEIGHT_ARRAY[np.asarray(criticality, dtype=np.intp)]
+    urgency_weight = _URGENCY_WEIGHT_ARRAY[np.asarray(urgency, dtype=np.intp)]
+    emissions = np.asarray(emissions_per_run_kg, dtype=np.float64)
+    frequency_ratio = np.asarray(frequency_ratio, dtype=np.float64)
+    optimization_potential = np.asarray(optimization_potential, dtype=np.float64)
     
-    # Normalize to 0-100 scale
-    ces_normalized = ces * 100
+    with np.errstate(invalid="ignore"):
+        scores = _score_kernel(
+            criticality_weight,
+            urgency_weight,
+            emissions,
+            frequency_ratio,
+            optimization_potential
+        )
+    if not as_dicts:
+        return scores
     
+    columns = (
+        *(column.tolist() for column in scores),
+        optimization_potential.tolist(),
+        criticality_weight.tolist(),
+        urgency_weight.tolist(),
+        list(emissions_per_run_kg),
+        frequency_ratio.tolist()
+    )
+    return [_score_dict(*row) for row in zip(*columns)]
+
+
+@njit(parallel=True, cache=True)
+def _score_kernel(criticality_weight, urgency_weight, emissions, frequency_ratio, optimization_potential):
+    """CES components per workload (see calculate_carbon_efficiency_score)"""
+    business_value = criticality_weight * 0.6 + urgency_weight * 0.4
+    carbon_intensity_score = 1.0 - np.minimum(emissions, 1.0)
+    alignment_score = np.minimum(
+        frequency_ratio, np.maximum(0.0, 1.0 - (frequency_ratio - 1.0) * 0.5)
+    )
+    ces_normalized = (
+        business_value * 0.4 +
+        carbon_intensity_score * 0.3 +
+        alignment_score * 0.2 +
+        (1.0 - optimization_potential * 0.3) * 0.1
+    ) * 100
+    return ces_normalized, business_value, carbon_intensity_score, alignment_score
+
+
+def _score_dict(ces_normalized: float,
+                business_value: float,
+                carbon_intensity_score: float,
+                alignment_score: float,
+                optimization_potential: float,
+                criticality_weight: float,
+                urgency_weight: float,
+                emissions_per_run_kg: float,
+                frequency_ratio: float) -> Dict:
+    """Rounded CES dictionary returned by the public scoring functions"""
     return {
         "ces_score": round(ces_normalized, 2),
         "business_value": round(business_value, 3),
@@ -83,10 +165,9 @@ def calculate_carbon_efficiency_score(
         "alignment_score": round(alignment_score, 3),
         "optimization_potential": round(optimization_potential, 3),
         "breakdown": {
-            "criticality_weight": criticality_weights.get(workload.criticality, 0.5),
-            "urgency_weight": urgency_weights.get(workload.urgency, 0.5),
+            "criticality_weight": criticality_weight,
+            "urgency_weight": urgency_weight,
             "emissions_per_run_kg": emissions_per_run_kg,
             "frequency_ratio": round(frequency_ratio, 2)
         }
     }
-
@@ -0,0 +1,17 @@
+"""
+Shared fixtures for the test suite
+"""
+
+import pytest
+from carbon_intelligence.agent.carbon_agent import CarbonAwareAgent
+
+
+@pytest.fixture
+def agent(tmp_path):
+    """Fresh agent writing its carbon and metrics data under tmp_path"""
+    agent = CarbonAwareAgent(
+        carbon_output_dir=str(tmp_path / "carbon"),
+        metrics_path=str(tmp_path / "metrics")
+    )
+    yield agent
+    agent.metrics_collector.close()
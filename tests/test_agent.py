@@ -2,29 +2,42 @@
 Basic tests for CarbonAwareAgent
 """
 
+import os
+import subprocess
+import sys
+from types import SimpleNamespace
+
 import pytest
-from src.agent.carbon_agent import CarbonAwareAgent
-from src.context.execution_context import (
+from carbon_intelligence.observability import carbon_tracker as carbon_tracker_module
+from carbon_intelligence.observability.carbon_tracker import CarbonTracker, EmissionResult
+from carbon_intelligence.observability import metrics as metrics_module
+from carbon_intelligence.observability.metrics import MetricsCollector
+from carbon_intelligence.observability.parquet_metrics import ParquetMetricsCollector
+from carbon_intelligence.utils import scoring
+from carbon_intelligence.utils.scoring import (
+    calculate_carbon_efficiency_score,
+    calculate_carbon_efficiency_scores_batch
+)
+from carbon_intelligence.context.execution_context import (
     WorkloadContext,
     CriticalityLevel,
     UrgencyLevel
 )
 
 
-def test_agent_initialization():
+def test_agent_initialization(agent):
     """Test agent can be initialized"""
-    agent = CarbonAwareAgent()
     assert agent is not None
     assert agent.carbon_tracker is not None
     assert agent.metrics_collector is not None
     assert agent.execution_context is not None
     assert agent.reasoning_engine is not None
+    assert agent.carbon_tracker.output_dir.endswith("carbon")
+    assert agent.metrics_collector.storage_path.endswith("metrics")
 
 
-def test_workload_registration():
+def test_workload_registration(agent):
     """Test workload registration"""
-    agent = CarbonAwareAgent()
-    
     workload = WorkloadContext(
         workload_id="test_workload",
         model_name="test_model",
@@ -44,25 +57,55 @@ def test_workload_registration():
     assert agent.execution_context.get_workload("test_workload") == workload
 
 
-def test_workload_analysis():
-    """Test workload analysis"""
-    agent = CarbonAwareAgent()
+def test_bulk_workload_registration(agent):
+    """Test registering several workloads in one call"""
+    workloads = [
+        WorkloadContext(
+            workload_id=f"bulk_{i}",
+            model_name=f"bulk_model_{i}",
+            description="Bulk-registered workload",
+            criticality=CriticalityLevel.LOW,
+            urgency=UrgencyLevel.BATCH,
+            sla_window_hours=24.0,
+            required_frequency_hours=24.0,
+            current_frequency_hours=24.0,
+            current_schedule="daily",
+            estimated_duration_seconds=60.0
+        )
+        for i in range(3)
+    ]
+    
+    agent.register_workloads(workloads)
     
+    assert agent.execution_context.list_workloads() == ["bulk_0", "bulk_1", "bulk_2"]
+    assert agent.execution_context.get_workload("bulk_1") is workloads[1]
+
+
+@pytest.mark.parametrize("sla, required, current, over_serving", [
+    (2.0, 2.0, 1.0, True),   # Runs hourly, needs every 2 hours
+    (4.0, 4.0, 1.0, True),   # Runs hourly, needs every 4 hours
+    (2.0, 2.0, 2.0, False),  # Runs exactly as often as required
+])
+def test_frequency_scenarios(agent, sla, required, current, over_serving):
+    """Test over-serving detection and analysis across frequency scenarios"""
     workload = WorkloadContext(
         workload_id="test_workload",
         model_name="test_model",
         description="Test workload",
         criticality=CriticalityLevel.MEDIUM,
         urgency=UrgencyLevel.NORMAL,
-        sla_window_hours=2.0,
-        required_frequency_hours=2.0,
-        current_frequency_hours=1.0,  # Over-serving
-        current_schedule="every_1_hour",
+        sla_window_hours=sla,
+        required_frequency_hours=required,
+        current_frequency_hours=current,
+        current_schedule=f"every_{current}_hours",
         estimated_duration_seconds=30.0
     )
     
     agent.register_workload(workload)
     
+    assert workload.is_over_serving() is over_serving
+    assert (workload.get_frequency_ratio() > 1.0) is over_serving
+    
     analysis = agent.analyze_workload("test_workload")
     
     assert analysis is not None
@@ -72,30 +115,416 @@ def test_workload_analysis():
     assert "summary" in analysis
 
 
-def test_over_serving_detection():
-    """Test detection of over-serving workloads"""
-    agent = CarbonAwareAgent()
-    
-    # Workload that over-serves
+def test_analysis_refreshes_after_new_execution(agent):
+    """Test cached analyses are recomputed once a new execution is recorded"""
     workload = WorkloadContext(
-        workload_id="over_serving",
-        model_name="over_serving_model",
-        description="Over-serving workload",
+        workload_id="cached_workload",
+        model_name="cached_model",
+        description="Cached workload",
         criticality=CriticalityLevel.MEDIUM,
         urgency=UrgencyLevel.NORMAL,
-        sla_window_hours=4.0,
-        required_frequency_hours=4.0,
-        current_frequency_hours=1.0,  # Runs hourly but only needs 4-hour window
-        current_schedule="every_1_hour",
+        sla_window_hours=2.0,
+        required_frequency_hours=2.0,
+        current_frequency_hours=2.0,
+        current_schedule="every_2_hours",
         estimated_duration_seconds=30.0
     )
+    agent.register_workload(workload)
     
+    first = agent.analyze_workload("cached_workload")
+    assert agent.analyze_workload("cached_workload") is first
+    
+    agent.metrics_collector.record_execution(
+        workload_id="cached_workload",
+        emissions_kg=0.5,
+        duration_seconds=30.0,
+        energy_kwh=1.0
+    )
+    
+    refreshed = agent.analyze_workload("cached_workload")
+    assert refreshed is not first
+    assert refreshed["execution_stats"]["total_executions"] == 1
+
+
+def test_prefetched_inputs_bypass_analysis_cache(agent):
+    """Test analyses of caller-supplied stats neither read nor fill the cache"""
+    workload = WorkloadContext(
+        workload_id="prefetched",
+        model_name="prefetched_model",
+        description="Prefetched workload",
+        criticality=CriticalityLevel.MEDIUM,
+        urgency=UrgencyLevel.NORMAL,
+        sla_window_hours=2.0,
+        required_frequency_hours=2.0,
+        current_frequency_hours=2.0,
+        current_schedule="every_2_hours",
+        estimated_duration_seconds=30.0
+    )
     agent.register_workload(workload)
+    fake_stats = {"total_executions": 5, "avg_emissions_per_run_kg": 0.5}
+    
+    supplied = agent.analyze_workload("prefetched", stats=fake_stats, history=[])
+    assert supplied["execution_stats"] == fake_stats
+    
+    # The fake stats were not cached for plain calls or the bulk analysis
+    real = agent.analyze_workload("prefetched")
+    assert real["execution_stats"]["total_executions"] == 0
+    assert agent.get_all_workloads_analysis()[0]["execution_stats"]["total_executions"] == 0
+    
+    # A cached plain analysis does not shadow supplied stats
+    assert agent.analyze_workload("prefetched", stats=fake_stats, history=[])["execution_stats"] == fake_stats
+
+
+def test_batch_reasoning_matches_single(agent):
+    """Test batch reasoning produces the same recommendations as per-workload reasoning"""
+    workloads = [
+        WorkloadContext(
+            workload_id=f"batch_{i}",
+            model_name=f"batch_model_{i}",
+            description="Batch reasoning workload",
+            criticality=CriticalityLevel.LOW,
+            urgency=UrgencyLevel.BATCH,
+            sla_window_hours=sla,
+            required_frequency_hours=4.0,
+            current_frequency_hours=current,
+            current_schedule=f"every_{current}_hours",
+            estimated_duration_seconds=600.0,
+            gpu_required=True
+        )
+        for i, (sla, current) in enumerate([(8.0, 1.0), (4.5, 2.0), (4.0, 1.0), (8.0, 8.0), (0.0, 1.0)])
+    ]
+    emissions = [0.05, 0.2, 0.1, 0.0, 0.3]
+    
+    engine = agent.reasoning_engine
+    batch = engine.analyze_workload_batch(workloads, emissions)
+    
+    assert len(batch) == len(workloads)
+    for workload, em, recs in zip(workloads, emissions, batch):
+        expected = engine.analyze_workload(workload, em)
+        assert [r.to_dict() for r in recs] == [r.to_dict() for r in expected]
+
+
+def test_batch_scoring_matches_single():
+    """Test batch CES scoring produces the same scores as per-workload scoring"""
+    workloads = [
+        WorkloadContext(
+            workload_id=f"score_{i}",
+            model_name=f"score_model_{i}",
+            description="Batch scoring workload",
+            criticality=criticality,
+            urgency=urgency,
+            sla_window_hours=8.0,
+            required_frequency_hours=required,
+            current_frequency_hours=1.0,
+            current_schedule="hourly",
+            estimated_duration_seconds=60.0,
+            gpu_required=False
+        )
+        for i, (criticality, urgency, required) in enumerate([
+            (CriticalityLevel.CRITICAL, UrgencyLevel.REAL_TIME, 1.0),
+            (CriticalityLevel.LOW, UrgencyLevel.BATCH, 4.0),
+            (CriticalityLevel.DEFERRABLE, UrgencyLevel.DEFERRABLE, 0.5),
+            (CriticalityLevel.MEDIUM, UrgencyLevel.NORMAL, 0.0)
+        ])
+    ]
+    emissions = [0.05, 2.0, 0.0, 0.3]
+    ratios = [w.get_frequency_ratio() for w in workloads]
+    potentials = [min(1.0, (r - 1.0) * 0.5) if w.is_over_serving() else 0.0
+                  for w, r in zip(workloads, ratios)]
+    
+    batch = calculate_carbon_efficiency_scores_batch(
+        [w.criticality for w in workloads],
+        [w.urgency for w in workloads],
+        emissions,
+        ratios,
+        potentials,
+        as_dicts=True
+    )
+    
+    for workload, em, potential, score in zip(workloads, emissions, potentials, batch):
+        assert score == calculate_carbon_efficiency_score(workload, em, potential)
+
+
+def test_emission_share_recommendations_need_emissions(agent):
+    """Test time-shift and resource recommendations are skipped without measured emissions"""
+    workload = WorkloadContext(
+        workload_id="unmeasured_batch",
+        model_name="unmeasured_batch_model",
+        description="Deferrable GPU batch workload",
+        criticality=CriticalityLevel.LOW,
+        urgency=UrgencyLevel.BATCH,
+        sla_window_hours=24.0,
+        required_frequency_hours=24.0,
+        current_frequency_hours=24.0,
+        current_schedule="daily",
+        estimated_duration_seconds=600.0,
+        gpu_required=True
+    )
     
-    assert workload.is_over_serving() is True
-    assert workload.get_frequency_ratio() > 1.0
+    engine = agent.reasoning_engine
+    
+    unmeasured = engine.analyze_workload(workload, emissions_per_run_kg=0.0)
+    assert [r.recommendation_type.value for r in unmeasured] == ["no_action"]
+    
+    measured = engine.analyze_workload(workload, emissions_per_run_kg=0.5)
+    assert [r.recommendation_type.value for r in measured] == ["time_shift", "optimize_resources"]
+
 
+def test_parquet_metrics_round_trip(tmp_path):
+    """Test Parquet-persisted metrics load back into a new collector"""
+    collector = ParquetMetricsCollector(str(tmp_path), batch_size=2)
+    for i in range(5):
+        collector.record_execution(
+            workload_id="even" if i % 2 == 0 else "odd",
+            emissions_kg=0.01 * i,
+            duration_seconds=1.0,
+            energy_kwh=0.1,
+            metadata={"run": i}
+        )
+    collector.flush()
+    
+    reloaded = ParquetMetricsCollector(str(tmp_path))
+    reloaded.load_metrics(["odd"])
+    
+    assert list(reloaded.metrics) == ["odd"]
+    assert reloaded.metrics["odd"] == collector.metrics["odd"]
+    assert reloaded.get_aggregate_stats("odd") == collector.get_aggregate_stats("odd")
+
+
+def test_parquet_buffer_read_without_flush_and_written_at_exit(tmp_path):
+    """Test buffered Parquet records are readable unflushed and written at exit"""
+    script = (
+        "import sys\n"
+        "from carbon_intelligence.observability.parquet_metrics import ParquetMetricsCollector\n"
+        "collector = ParquetMetricsCollector(sys.argv[1], batch_size=100)\n"
+        "for i in range(3):\n"
+        "    collector.record_execution('buffered', 0.1 * (i + 1), 1.0, 0.01)\n"
+        "collector.load_metrics()\n"
+        "assert len(collector.metrics['buffered']) == 3\n"
+        "assert not collector._parquet_paths()\n"
+    )
+    subprocess.run([sys.executable, "-c", script, str(tmp_path)], check=True)
+    
+    reloaded = ParquetMetricsCollector(str(tmp_path))
+    reloaded.load_metrics()
+    assert [r["emissions_kg"] for r in reloaded.metrics["buffered"]] == [0.1, 0.2, 0.3]
 
-if __name__ == "__main__":
+def test_small_runs_keep_significant_digits(tmp_path):
+    """Test ingest rounding keeps significant digits of very small runs"""
+    collector = MetricsCollector(str(tmp_path))
+    collector.record_execution("tiny", 2.3456789e-8, 0.0123456789, 1.2345678e-7)
+    
+    record = collector.metrics["tiny"][0]
+    assert record["emissions_kg"] == 2.34568e-8
+    assert record["energy_kwh"] == 1.23457e-7
+    assert record["duration_seconds"] == 0.0123457
+    collector.close()
+
+def test_workload_context_dict_round_trip():
+    """Test contexts serialize levels as labels and load back unchanged"""
+    context = WorkloadContext(
+        workload_id="round_trip",
+        model_name="model",
+        description="Round trip",
+        criticality=CriticalityLevel.HIGH,
+        urgency=UrgencyLevel.REAL_TIME,
+        sla_window_hours=2.0,
+        required_frequency_hours=6.0,
+        current_frequency_hours=1.0,
+        current_schedule="every_1_hour",
+        estimated_duration_seconds=60.0,
+        metadata={"owner": "ml"}
+    )
+    data = context.to_dict()
+    
+    assert data["criticality"] == "high"
+    assert data["urgency"] == "real_time"
+    assert WorkloadContext.from_dict(data) == context
+
+
+def test_level_labels_and_ordering():
+    """Test label lookup and that level order matches the scoring weight index"""
+    assert UrgencyLevel.from_label("real_time") is UrgencyLevel.REAL_TIME
+    with pytest.raises(ValueError):
+        CriticalityLevel.from_label("urgent")
+    
+    assert sorted([CriticalityLevel.LOW, CriticalityLevel.CRITICAL]) == [CriticalityLevel.CRITICAL, CriticalityLevel.LOW]
+    assert [level.value for level in CriticalityLevel] == list(range(len(scoring._CRITICALITY_WEIGHTS)))
+    assert [level.value for level in UrgencyLevel] == list(range(len(scoring._URGENCY_WEIGHTS)))
+    # Lower levels are more important and weigh more
+    assert list(scoring._CRITICALITY_WEIGHTS) == sorted(scoring._CRITICALITY_WEIGHTS, reverse=True)
+    assert list(scoring._URGENCY_WEIGHTS) == sorted(scoring._URGENCY_WEIGHTS, reverse=True)
+
+def _record_runs(collector, count):
+    """Record count runs alternating between two workloads"""
+    for i in range(count):
+        collector.record_execution(
+            workload_id=f"persisted_{i % 2}",
+            emissions_kg=0.001 * (i + 1),
+            duration_seconds=1.5,
+            energy_kwh=0.01,
+            metadata={"run": i}
+        )
+
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+def test_metrics_log_round_trip(tmp_path, monkeypatch, use_orjson):
+    """Test flushed records load back with the same history and stats"""
+    if not use_orjson:
+        monkeypatch.setattr(metrics_module, "orjson", None)
+    collector = MetricsCollector(str(tmp_path))
+    _record_runs(collector, 10)
+    collector.flush()
+    
+    reloaded = MetricsCollector(str(tmp_path))
+    reloaded.load_metrics()
+    for workload_id in ("persisted_0", "persisted_1"):
+        assert reloaded.metrics[workload_id] == collector.metrics[workload_id]
+        assert reloaded.get_aggregate_stats(workload_id) == collector.get_aggregate_stats(workload_id)
+    collector.close()
+
+
+def test_metrics_round_trip_across_sealed_segments(tmp_path, monkeypatch):
+    """Test records spread over sealed gzip segments and the log load back in order"""
+    monkeypatch.setattr(metrics_module, "_SEAL_THRESHOLD_BYTES", 300)
+    collector = MetricsCollector(str(tmp_path))
+    for _ in range(4):
+        _record_runs(collector, 5)
+        collector.flush()
+    
+    assert metrics_module._segment_paths(str(tmp_path))
+    
+    reloaded = MetricsCollector(str(tmp_path))
+    reloaded.load_metrics()
+    for workload_id in ("persisted_0", "persisted_1"):
+        assert reloaded.metrics[workload_id] == collector.metrics[workload_id]
+        assert reloaded.get_aggregate_stats(workload_id) == collector.get_aggregate_stats(workload_id)
+    collector.close()
+
+
+def test_close_drains_queued_records(tmp_path):
+    """Test close() writes every queued record and stops the writer"""
+    collector = MetricsCollector(str(tmp_path))
+    _record_runs(collector, 500)
+    writer = collector._writer
+    collector.close()
+    
+    assert not writer.is_alive()
+    reloaded = MetricsCollector(str(tmp_path))
+    reloaded.load_metrics()
+    assert sum(len(records) for records in reloaded.metrics.values()) == 500
+
+def test_sealing_never_overwrites_segments(tmp_path, monkeypatch):
+    """Test a seal after an older segment was pruned takes a fresh segment name"""
+    monkeypatch.setattr(metrics_module, "_SEAL_THRESHOLD_BYTES", 1)
+    collector = MetricsCollector(str(tmp_path))
+    for i in range(3):
+        collector.record_execution("sealed", 0.1, 1.0, 0.01)
+        collector.flush()
+    
+    segments = metrics_module._segment_paths(str(tmp_path))
+    assert len(segments) == 3
+    os.remove(segments[0])
+    
+    collector.record_execution("sealed", 0.1, 1.0, 0.01)
+    collector.close()
+    
+    remaining = metrics_module._segment_paths(str(tmp_path))
+    assert remaining[:2] == segments[1:]
+    assert remaining[2].endswith("metrics.000003.jsonl.gz")
+
+def test_in_memory_cap_falls_back_to_disk(tmp_path):
+    """Test capped collectors keep recent records in memory and older ones on disk"""
+    collector = MetricsCollector(str(tmp_path), in_memory_cap=4)
+    for i in range(10):
+        collector.record_execution("capped", 0.25 * i, 1.0, 0.5)
+    
+    assert len(collector.metrics["capped"]) <= 4
+    assert len(collector.as_arrays("capped")["timestamp"]) == len(collector.metrics["capped"])
+    
+    history = collector.get_workload_history("capped")
+    assert [r["emissions_kg"] for r in history] == [0.25 * i for i in range(10)]
+    
+    stats = collector.get_aggregate_stats("capped")
+    assert stats["total_executions"] == 10
+    assert stats["total_emissions_kg"] == pytest.approx(11.25)
+    collector.close()
+
+
+def test_emission_result_from_emissions_data():
+    """Test emission results read CodeCarbon attributes with defaults for gaps"""
+    data = SimpleNamespace(emissions=0.002, energy_consumed=0.01, duration=3.5,
+                           cpu_power=42.0, gpu_power=None, region="quebec")
+    
+    result = EmissionResult.from_emissions_data("tracked", data)
+    assert result.emissions_kg == 0.002
+    assert result.gpu_power_watts == 0
+    assert result.ram_power_watts == 0
+    assert result.country_iso_code == "Unknown"
+    assert result.to_dict()["region"] == "quebec"
+    
+    empty = EmissionResult.from_emissions_data("tracked", None).to_dict()
+    assert empty["emissions_kg"] == 0 and empty["workload_id"] == "tracked"
+
+
+
+class _StubEmissionsTracker:
+    """Stands in for codecarbon's EmissionsTracker without measuring anything"""
+    
+    def __init__(self, **kwargs):
+        self.final_emissions_data = None
+    
+    def start(self):
+        pass
+    
+    def stop(self):
+        return 0.0
+
+
+def test_starting_tracker_is_not_active(tmp_path, monkeypatch):
+    """Test a tracker that is still starting cannot be stopped, queried or restarted"""
+    tracker = CarbonTracker(output_dir=str(tmp_path))
+    seen = {}
+    
+    class SlowStartTracker(_StubEmissionsTracker):
+        def start(self):
+            # Runs while start_tracking holds the placeholder
+            with pytest.raises(ValueError):
+                tracker.stop_tracking("starting")
+            with pytest.raises(ValueError):
+                tracker.start_tracking("starting")
+            seen["current"] = tracker.get_current_emissions("starting")
+    
+    monkeypatch.setattr(carbon_tracker_module, "EmissionsTracker", SlowStartTracker)
+    tracker.start_tracking("starting")
+    
+    assert seen["current"] is None
+    assert tracker.get_current_emissions("starting")["status"] == "tracking_active"
+    assert tracker.stop_tracking("starting").workload_id == "starting"
+    assert tracker.active_trackers == {}
+
+
+
+@pytest.mark.parametrize("stop_fails", [False, True])
+def test_track_stops_tracker_when_block_raises(tmp_path, monkeypatch, stop_fails):
+    """Test track() stops tracking and re-raises the block's exception"""
+    stopped = []
+    
+    class RecordingTracker(_StubEmissionsTracker):
+        def stop(self):
+            stopped.append(self)
+            if stop_fails:
+                raise RuntimeError("stop failed")
+            return 0.0
+    
+    monkeypatch.setattr(carbon_tracker_module, "EmissionsTracker", RecordingTracker)
+    tracker = CarbonTracker(output_dir=str(tmp_path))
+    
+    with pytest.raises(KeyError, match="body failed"):
+        with tracker.track("failing"):
+            raise KeyError("body failed")
+    
+    assert len(stopped) == 1
+    assert tracker.active_trackers == {}
     pytest.main([__file__, "-v"])
 